@@ -6,7 +6,6 @@ from app.application.exeptions import (
     NotFoundError,
     ValidationError,
 )
-from app.application.ports.event_bus import EventBus
 from app.application.ports.uow import UnitOfWork
 from app.application.ports.websocket_publisher import WebSocketPublisher
 from app.application.queries.dto import MatchResultDTO
@@ -27,11 +26,9 @@ class CompleteMatchHandler:
     def __init__(
         self,
         uow: UnitOfWork,
-        event_bus: EventBus,
         ws_publisher: WebSocketPublisher | None = None,
     ):
         self._uow = uow
-        self._event_bus = event_bus
         self._ws_publisher = ws_publisher
 
     def _ensure_match_live(self, match: Match) -> None:
@@ -39,14 +36,7 @@ class CompleteMatchHandler:
             raise ConflictError(f"Cannot complete match: status is {match.status.name}")
 
     def _count_sets(self, match: Match) -> tuple[int, int]:
-        sets_a = 0
-        sets_b = 0
-        for set_score in match.set_scores:
-            if set_score.a > set_score.b:
-                sets_a += 1
-            else:
-                sets_b += 1
-        return (sets_a, sets_b)
+        return (match.sets_won_a, match.sets_won_b)
 
     def _validate_winner(self, winner: int, match: Match) -> None:
         if winner not in (1, 2):
@@ -64,10 +54,10 @@ class CompleteMatchHandler:
     ) -> list[DomainEvent]:
         match.complete(winner)
         await self._uow.matches().add(match)
-        await self._uow.commit()
         events = match.domain_events
         match.clear_domain_events()
-        await self._event_bus.publish(events)
+        await self._uow.outbox().add(events)
+        await self._uow.commit()
 
         if self._ws_publisher:
             # Отправляем полное состояние матча после завершения
@@ -81,6 +71,8 @@ class CompleteMatchHandler:
                     "score_b": match.score.b.value,
                     "rotation_a": match.rotation.team_a.value,
                     "rotation_b": match.rotation.team_b.value,
+                    "sets_won_a": match.sets_won_a,
+                    "sets_won_b": match.sets_won_b,
                     "changes": ["match_completed"],
                 }
             }
@@ -7,7 +7,6 @@ from app.application.exeptions import (
     NotFoundError,
     ValidationError,
 )
-from app.application.ports.event_bus import EventBus
 from app.application.ports.uow import UnitOfWork
 from app.application.ports.websocket_publisher import WebSocketPublisher
 from app.application.queries.dto import MatchStateDTO
@@ -40,11 +39,9 @@ class RecordEventHandler:
     def __init__(
         self,
         uow: UnitOfWork,
-        event_bus: EventBus,
         ws_publisher: WebSocketPublisher | None = None,
     ):
         self._uow = uow
-        self._event_bus = event_bus
         self._ws_publisher = ws_publisher
 
     def _ensure_match_live(self, match: Match) -> None:
@@ -58,7 +55,7 @@ class RecordEventHandler:
     def _validate_player_in_composition(
         self, player_number: int, team_id: int, match: Match
     ) -> None:
-        player_num = PlayerNumber(player_number)
+        player_num = PlayerNumber.of(player_number)
         if team_id == 1:
             composition = match.composition_a
         else:
@@ -97,7 +94,7 @@ class RecordEventHandler:
         except KeyError:
             raise ValidationError(f"Unknown result: {cmd.result}")
         timestamp = Timestamp(cmd.timestamp or now())
-        player_id = PlayerID(cmd.player_number)
+        player_id = PlayerID.of(cmd.player_number)
         rotation_position = self._get_current_rotation(match, cmd.team_id)
         return MatchEvent(
             timestamp,
@@ -115,12 +112,33 @@ class RecordEventHandler:
     ) -> list[DomainEvent]:
         match.record_event(event)
         await self._uow.matches().add(match)
-        await self._uow.commit()
         events = match.domain_events
         match.clear_domain_events()
-        await self._event_bus.publish(events)
+        await self._uow.outbox().add(events)
+        await self._uow.commit()
         return events
 
+    async def _publish_state(self, match: Match, changes: list[str]) -> None:
+        if not self._ws_publisher:
+            return
+        # Отправляем полное состояние матча после каждого события
+        match_state = {
+            "type": "match_state",
+            "match_state": {
+                "match_id": str(match.id.value),
+                "status": match.status.name,
+                "current_set": match.current_set.value,
+                "score_a": match.score.a.value,
+                "score_b": match.score.b.value,
+                "rotation_a": match.rotation.team_a.value,
+                "rotation_b": match.rotation.team_b.value,
+                "sets_won_a": match.sets_won_a,
+                "sets_won_b": match.sets_won_b,
+                "changes": changes,
+            }
+        }
+        await self._ws_publisher.publish(match.id, match_state)
+
     async def _load_match(self, raw_id: UUID) -> Match:
         match_id = MatchID(raw_id)
         match = await self._uow.matches().get(match_id)
@@ -134,20 +152,5 @@ class RecordEventHandler:
         match_event = self._create_match_event(cmd, match)
         events = await self._process_event(match, match_event)
         changes = self._detect_changes(events)
-        if self._ws_publisher:
-            # Отправляем полное состояние матча после каждого события
-            match_state = {
-                "type": "match_state",
-                "match_state": {
-                    "match_id": str(match.id.value),
-                    "status": match.status.name,
-                    "current_set": match.current_set.value,
-                    "score_a": match.score.a.value,
-                    "score_b": match.score.b.value,
-                    "rotation_a": match.rotation.team_a.value,
-                    "rotation_b": match.rotation.team_b.value,
-                    "changes": changes,
-                }
-            }
-            await self._ws_publisher.publish(match.id, match_state)
+        await self._publish_state(match, changes)
         return MatchStateDTO.from_domain(match, changes)
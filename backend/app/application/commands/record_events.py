@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.application.commands.record_event import (
+    RecordEventCommand,
+    RecordEventHandler,
+)
+from app.application.exeptions import ApplicationError
+from app.application.queries.dto import (
+    EventResultDTO,
+    MatchBatchStateDTO,
+    MatchStateDTO,
+)
+from app.domain.entities.matches import Match
+
+
+@dataclass
+class RecordEventsCommand:
+    match_id: UUID
+    events: list[RecordEventCommand]
+
+
+class RecordEventsHandler(RecordEventHandler):
+    def _apply_event(
+        self, match: Match, cmd: RecordEventCommand, index: int
+    ) -> EventResultDTO:
+        try:
+            self._validate_command(cmd, match)
+            match_event = self._create_match_event(cmd, match)
+        except (ApplicationError, ValueError) as e:
+            return EventResultDTO(index=index, accepted=False, error=str(e))
+        # Без копии всего списка событий: иначе пачка становится квадратичной
+        emitted = match.domain_events_count
+        match.record_event(match_event)
+        changes = self._detect_changes(match.domain_events_since(emitted))
+        return EventResultDTO(
+            index=index,
+            accepted=True,
+            seq=match.events_count,
+            current_set=match.current_set.value,
+            score_a=match.score.a.value,
+            score_b=match.score.b.value,
+            changes=changes,
+        )
+
+    async def handle(self, cmd: RecordEventsCommand) -> MatchBatchStateDTO:
+        match = await self._load_match(cmd.match_id)
+        self._ensure_match_live(match)
+        # Невалидные события отклоняются по одному, остальные применяются
+        # по порядку и сохраняются одной транзакцией вместе с outbox
+        results = [
+            self._apply_event(match, event_cmd, index)
+            for index, event_cmd in enumerate(cmd.events)
+        ]
+        changes: list[str] = []
+        if any(result.accepted for result in results):
+            await self._uow.matches().add(match)
+            events = match.domain_events
+            match.clear_domain_events()
+            await self._uow.outbox().add(events)
+            await self._uow.commit()
+            changes = list(dict.fromkeys(self._detect_changes(events)))
+            await self._publish_state(match, changes)
+        return MatchBatchStateDTO(
+            match_state=MatchStateDTO.from_domain(match, changes),
+            results=results,
+        )
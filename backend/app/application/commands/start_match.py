@@ -1,7 +1,6 @@
 from dataclasses import dataclass
 
 from app.application.exeptions import ConflictError, ValidationError
-from app.application.ports.event_bus import EventBus
 from app.application.ports.uow import UnitOfWork
 from app.application.queries.dto import MatchDTO
 from app.domain.entities.matches import Match
@@ -20,9 +19,8 @@ class StartMatchCommand:
 
 
 class StartMatchHandler:
-    def __init__(self, uow: UnitOfWork, event_bus: EventBus):
+    def __init__(self, uow: UnitOfWork):
         self._uow = uow
-        self._event_bus = event_bus
 
     def _validate_composition(self, composition: list[int]) -> None:
         seen = set()
@@ -38,8 +36,8 @@ class StartMatchHandler:
     async def _create_and_save_match(self, cmd: StartMatchCommand):
         team_a = TeamName(cmd.team_a_name)
         team_b = TeamName(cmd.team_b_name)
-        comp_a = TeamComposition([PlayerNumber(n) for n in cmd.composition_a])
-        comp_b = TeamComposition([PlayerNumber(n) for n in cmd.composition_b])
+        comp_a = TeamComposition([PlayerNumber.of(n) for n in cmd.composition_a])
+        comp_b = TeamComposition([PlayerNumber.of(n) for n in cmd.composition_b])
         chat_id = ChatID(cmd.chat_id)
         match = Match.start(
             team_a,
@@ -49,10 +47,10 @@ class StartMatchHandler:
             chat_id,
         )
         await self._uow.matches().add(match)
-        await self._uow.commit()
         events = match.domain_events
         match.clear_domain_events()
-        await self._event_bus.publish(events)
+        await self._uow.outbox().add(events)
+        await self._uow.commit()
         return match
 
     async def _ensure_no_live_match(self, raw_id: int) -> None:
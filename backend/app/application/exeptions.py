@@ -12,3 +12,8 @@ class NotFoundError(ApplicationError):
 
 class ConflictError(ApplicationError):
     pass
+
+
+class DuplicateRequestError(ApplicationError):
+    # Повтор команды, которая уже применена, но ответ на неё не сохранён
+    pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class IdempotencyKeys(ABC):
+    @abstractmethod
+    async def reserve(self, action: str, key: str) -> bool: ...
+
+    @abstractmethod
+    async def response(self, action: str, key: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def save(self, action: str, key: str, response: dict[str, Any]) -> None: ...
+
+
+__all__ = [
+    "IdempotencyKeys",
+]
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+
+from app.domain.events import DomainEvent
+
+
+class Outbox(ABC):
+    @abstractmethod
+    async def add(self, events: list[DomainEvent]) -> None: ...
+
+
+__all__ = [
+    "Outbox",
+]
@@ -9,7 +9,7 @@ class MatchRepository(ABC):
     async def add(self, match: Match) -> None: ...
 
     @abstractmethod
-    async def get(self, match_id: MatchID) -> Match: ...
+    async def get(self, match_id: MatchID, at_seq: int | None = None) -> Match: ...
 
     @abstractmethod
     async def get_live_by_chat(self, chat_id: ChatID) -> Match | None: ...
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from app.application.ports.idempotency import IdempotencyKeys
+from app.application.ports.outbox import Outbox
 from app.application.ports.repository import MatchRepository
 
 
@@ -13,6 +15,12 @@ class UnitOfWork(ABC):
     @abstractmethod
     def matches(self) -> MatchRepository: ...
 
+    @abstractmethod
+    def outbox(self) -> Outbox: ...
+
+    @abstractmethod
+    def idempotency(self) -> IdempotencyKeys: ...
+
 
 __all__ = [
     "UnitOfWork",
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 from uuid import UUID
 
+from app.domain.values.identifiers import MatchID
+
 
 class WebSocketPublisher(ABC):
     @abstractmethod
-    async def publish(self, match_id: UUID, data: dict): ...
+    async def publish(self, match_id: MatchID | UUID, data: dict): ...
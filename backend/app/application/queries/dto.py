@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from uuid import UUID
 
@@ -45,6 +45,8 @@ class MatchStateDTO:
     score_b: int
     rotation_a: int
     rotation_b: int
+    sets_won_a: int
+    sets_won_b: int
     changes: list[str]
 
     @staticmethod
@@ -57,10 +59,30 @@ class MatchStateDTO:
             score_b=match.score.b.value,
             rotation_a=match.rotation.team_a.value,
             rotation_b=match.rotation.team_b.value,
+            sets_won_a=match.sets_won_a,
+            sets_won_b=match.sets_won_b,
             changes=changes,
         )
 
 
+@dataclass
+class EventResultDTO:
+    index: int
+    accepted: bool
+    seq: int | None = None
+    current_set: int | None = None
+    score_a: int | None = None
+    score_b: int | None = None
+    changes: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+@dataclass
+class MatchBatchStateDTO:
+    match_state: MatchStateDTO
+    results: list[EventResultDTO]
+
+
 @dataclass
 class MatchResultDTO:
     match_id: UUID
@@ -97,3 +119,53 @@ class AdviceDTO:
     match_id: UUID
     advice: str
     generated_at: datetime
+
+
+@dataclass
+class TeamMatchStatsDTO:
+    team_id: int
+    rallies: int
+    scored: int
+    errors: int
+    points_won: int
+    sets_won: int
+
+
+@dataclass
+class MatchReportDTO:
+    match_id: UUID
+    team_a_name: str
+    team_b_name: str
+    rallies: int
+    points_a: int
+    points_b: int
+    sets_a: int
+    sets_b: int
+    winner: int | None
+    started_at: datetime
+    updated_at: datetime
+    teams: list[TeamMatchStatsDTO] = field(default_factory=list)
+
+
+@dataclass
+class PlayerStatsDTO:
+    team_id: int
+    player_number: int
+    actions: int
+    scored: int
+    errors: int
+    serves: int
+    attacks: int
+    blocks: int
+
+
+@dataclass
+class TeamReportDTO:
+    team_name: str
+    matches: int
+    wins: int
+    sets_won: int
+    points_won: int
+    rallies: int
+    scored: int
+    errors: int
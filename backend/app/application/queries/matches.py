@@ -108,21 +108,27 @@ class MatchQueries:
 
     async def get_match_events(self, match_id: UUID) -> list[MatchEventDTO]:
         query = """
-            SELECT match_id, timestamp, player_id, team_id, action_type,
-                result, rotation, set_number 
-            FROM matches
+            SELECT match_id, timestamp, player_number, team_id, action_type,
+                result, rotation_a, rotation_b, set_number
+            FROM match_events
             WHERE match_id = $1
-            ORDER BY timestamp ASC
+            ORDER BY seq ASC
         """
         rows = await self._pool.fetch(query, str(match_id))
-        return [
-            MatchEventDTO(
-                timestamp=row["timestamp"],
-                player_id=row["player_id"],
-                team_id=row["team_id"],
-                action_type=row["action_type"],
-                result=row["result"],
-                rotation=row["rotation"],
+        result = []
+        for row in rows:
+            if row["team_id"] == 1:
+                rotation = row["rotation_a"]
+            else:
+                rotation = row["rotation_b"]
+            result.append(
+                MatchEventDTO(
+                    timestamp=row["timestamp"],
+                    player_id=row["player_number"],
+                    team_id=row["team_id"],
+                    action_type=row["action_type"],
+                    result=row["result"],
+                    rotation=rotation,
+                )
             )
-            for row in rows
-        ]
+        return result
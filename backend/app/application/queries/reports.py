@@ -0,0 +1,234 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import UUID
+
+from asynch import DictCursor, Pool
+
+from app.application.queries.dto import (
+    MatchReportDTO,
+    PlayerStatsDTO,
+    TeamMatchStatsDTO,
+    TeamReportDTO,
+)
+
+_MATCH_SUMMARY = """
+    SELECT
+        s.match_id AS match_id,
+        t.team_a AS team_a,
+        t.team_b AS team_b,
+        s.rallies AS rallies,
+        s.points_a AS points_a,
+        s.points_b AS points_b,
+        s.sets_a AS sets_a,
+        s.sets_b AS sets_b,
+        s.winner AS winner,
+        s.started_at AS started_at,
+        s.updated_at AS updated_at
+    FROM (
+        SELECT
+            match_id,
+            uniqExactMerge(rallies) AS rallies,
+            uniqExactMerge(points_a) AS points_a,
+            uniqExactMerge(points_b) AS points_b,
+            uniqExactMerge(sets_a) AS sets_a,
+            uniqExactMerge(sets_b) AS sets_b,
+            max(winner) AS winner,
+            min(first_event_at) AS started_at,
+            max(last_event_at) AS updated_at
+        FROM match_summary
+        {where}
+        GROUP BY match_id
+        ORDER BY updated_at DESC
+        LIMIT %(limit)s
+    ) AS s
+    LEFT JOIN (
+        SELECT match_id, any(team_a) AS team_a, any(team_b) AS team_b
+        FROM match_teams
+        {where}
+        GROUP BY match_id
+    ) AS t USING (match_id)
+    ORDER BY updated_at DESC
+"""
+
+_TEAM_MATCH_STATS = """
+    SELECT
+        team_id,
+        uniqExactMerge(rallies) AS rallies,
+        uniqExactMerge(scored) AS scored,
+        uniqExactMerge(errors) AS errors,
+        uniqExactMerge(points_won) AS points_won,
+        uniqExactMerge(sets_won) AS sets_won
+    FROM team_match_stats
+    WHERE match_id = toUUID(%(match_id)s) AND team_id IN (1, 2)
+    GROUP BY team_id
+    ORDER BY team_id
+"""
+
+_PLAYER_STATS = """
+    SELECT
+        team_id,
+        player_number,
+        sum(events) AS actions,
+        sumIf(events, result = 'SCORED') AS scored,
+        sumIf(events, result = 'ERROR') AS errors,
+        sumIf(events, action_type = 'SERVE') AS serves,
+        sumIf(events, action_type = 'ATTACK') AS attacks,
+        sumIf(events, action_type = 'BLOCK') AS blocks
+    FROM (
+        SELECT
+            team_id,
+            player_number,
+            action_type,
+            result,
+            uniqExactMerge(events) AS events
+        FROM player_action_stats
+        WHERE match_id = toUUID(%(match_id)s)
+        GROUP BY team_id, player_number, action_type, result
+    )
+    GROUP BY team_id, player_number
+    ORDER BY team_id, scored DESC, player_number
+"""
+
+_TEAM_REPORT = """
+    SELECT
+        count() AS matches,
+        sum(won) AS wins,
+        sum(sets_won) AS sets_won,
+        sum(points_won) AS points_won,
+        sum(rallies) AS rallies,
+        sum(scored) AS scored,
+        sum(errors) AS errors
+    FROM (
+        SELECT
+            match_id,
+            team_id,
+            uniqExactMerge(won) AS won,
+            uniqExactMerge(sets_won) AS sets_won,
+            uniqExactMerge(points_won) AS points_won,
+            uniqExactMerge(rallies) AS rallies,
+            uniqExactMerge(scored) AS scored,
+            uniqExactMerge(errors) AS errors
+        FROM team_match_stats
+        WHERE (match_id, team_id) IN (
+            SELECT match_id, toUInt8(1) FROM match_teams WHERE team_a = %(team)s
+            UNION ALL
+            SELECT match_id, toUInt8(2) FROM match_teams WHERE team_b = %(team)s
+        )
+        GROUP BY match_id, team_id
+    )
+"""
+
+
+class ReportQueries:
+    """Отчёты из агрегатов ClickHouse с коротким кэшем.
+
+    Одинаковые запросы внутри TTL отдаются из памяти, а параллельные
+    промахи по одному ключу ждут один общий запрос к ClickHouse.
+    """
+
+    def __init__(self, pool: Pool, ttl: float, max_entries: int = 1024):
+        self._pool = pool
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._cache: dict[tuple, tuple[float, Any]] = {}
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    async def _fetch(self, query: str, params: dict[str, Any]) -> list[dict]:
+        async with self._pool.connection() as conn:
+            async with conn.cursor(cursor=DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+
+    def _store(self, key: tuple, value: Any) -> None:
+        now = time.monotonic()
+        if len(self._cache) >= self._max_entries:
+            for stale in [k for k, (exp, _) in self._cache.items() if exp <= now]:
+                del self._cache[stale]
+            if len(self._cache) >= self._max_entries:
+                del self._cache[next(iter(self._cache))]
+        self._cache[key] = (now + self._ttl, value)
+
+    async def _cached(self, key: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await load()
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение уже отдали вызывающему, ожидающих может и не быть
+            future.exception()
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.cancel()
+
+    @staticmethod
+    def _match_report(row: dict) -> MatchReportDTO:
+        return MatchReportDTO(
+            match_id=row["match_id"],
+            team_a_name=row["team_a"],
+            team_b_name=row["team_b"],
+            rallies=row["rallies"],
+            points_a=row["points_a"],
+            points_b=row["points_b"],
+            sets_a=row["sets_a"],
+            sets_b=row["sets_b"],
+            winner=row["winner"] or None,
+            started_at=row["started_at"],
+            updated_at=row["updated_at"],
+        )
+
+    async def recent_matches(self, limit: int = 50) -> list[MatchReportDTO]:
+        async def load():
+            rows = await self._fetch(_MATCH_SUMMARY.format(where=""), {"limit": limit})
+            return [self._match_report(row) for row in rows]
+
+        return await self._cached(("recent_matches", limit), load)
+
+    async def match_report(self, match_id: UUID) -> MatchReportDTO | None:
+        async def load():
+            params = {"match_id": str(match_id), "limit": 1}
+            where = "WHERE match_id = toUUID(%(match_id)s)"
+            rows, teams = await asyncio.gather(
+                self._fetch(_MATCH_SUMMARY.format(where=where), params),
+                self._fetch(_TEAM_MATCH_STATS, params),
+            )
+            if not rows:
+                return None
+            report = self._match_report(rows[0])
+            report.teams = [TeamMatchStatsDTO(**row) for row in teams]
+            return report
+
+        return await self._cached(("match_report", match_id), load)
+
+    async def player_stats(self, match_id: UUID) -> list[PlayerStatsDTO]:
+        async def load():
+            rows = await self._fetch(_PLAYER_STATS, {"match_id": str(match_id)})
+            return [PlayerStatsDTO(**row) for row in rows]
+
+        return await self._cached(("player_stats", match_id), load)
+
+    async def team_report(self, team_name: str) -> TeamReportDTO:
+        async def load():
+            rows = await self._fetch(_TEAM_REPORT, {"team": team_name})
+            return TeamReportDTO(team_name=team_name, **rows[0])
+
+        return await self._cached(("team_report", team_name), load)
+
+
+__all__ = [
+    "ReportQueries",
+]
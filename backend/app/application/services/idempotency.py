@@ -0,0 +1,44 @@
+import logging
+from typing import Any, Awaitable, Callable
+
+from app.application.exeptions import DuplicateRequestError
+from app.application.ports.uow import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+Response = dict[str, Any]
+
+
+def idempotent_job(
+    action: str,
+    key: str | None,
+    job: Callable[[UnitOfWork], Awaitable[Response]],
+) -> Callable[[UnitOfWork], Awaitable[Response]]:
+    """Оборачивает задачу так, чтобы повтор с тем же ключом не выполнялся.
+
+    Ключ резервируется в транзакции команды, поэтому два параллельных
+    повтора не пройдут оба, а падение после коммита не приведёт к повторному
+    выполнению при передоставке сообщения.
+    """
+    if not key:
+        return job
+
+    async def run(uow: UnitOfWork) -> Response:
+        keys = uow.idempotency()
+        if not await keys.reserve(action, key):
+            response = await keys.response(action, key)
+            if response is None:
+                # Команда применена, но ответ не успели сохранить
+                raise DuplicateRequestError(f"{action} {key} has already been applied")
+            logger.info(f"Replaying {action} response for key {key}")
+            return response
+        response = await job(uow)
+        await keys.save(action, key, response)
+        return response
+
+    return run
+
+
+__all__ = [
+    "idempotent_job",
+]
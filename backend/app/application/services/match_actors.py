@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+from uuid import UUID
+
+from app.application.ports.uow import UnitOfWork
+from app.domain.entities.matches import Match
+from app.domain.enums import MatchStatusEnum
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+UnitOfWorkFactory = Callable[[dict[UUID, Match]], UnitOfWork]
+Job = Callable[[UnitOfWork], Awaitable[T]]
+
+
+class MatchActor:
+    def __init__(
+        self,
+        match_id: UUID,
+        uow_factory: UnitOfWorkFactory,
+        idle_timeout: float,
+        mailbox_size: int,
+        on_exit: Callable[["MatchActor"], None],
+    ):
+        self.match_id = match_id
+        self._uow_factory = uow_factory
+        self._idle_timeout = idle_timeout
+        self._on_exit = on_exit
+        self._mailbox: asyncio.Queue[tuple[Job, asyncio.Future]] = asyncio.Queue(
+            maxsize=mailbox_size
+        )
+        self._identity_map: dict[UUID, Match] = {}
+        self._task = asyncio.create_task(self._run(), name=f"match-actor-{match_id}")
+
+    async def ask(self, job: Job[T]) -> T:
+        future = asyncio.get_running_loop().create_future()
+        await self._mailbox.put((job, future))
+        return await future
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self._mailbox.empty():
+            _, future = self._mailbox.get_nowait()
+            future.cancel()
+
+    def _is_live(self) -> bool:
+        match = self._identity_map.get(self.match_id)
+        return match is None or match.status == MatchStatusEnum.LIVE
+
+    async def _execute(self, job: Job[T]) -> T:
+        async with self._uow_factory(self._identity_map) as uow:
+            return await job(uow)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                try:
+                    job, future = await asyncio.wait_for(
+                        self._mailbox.get(), timeout=self._idle_timeout
+                    )
+                except TimeoutError:
+                    if self._mailbox.empty():
+                        logger.debug(f"Match actor {self.match_id} idle, stopping")
+                        break
+                    continue
+
+                if future.cancelled():
+                    continue
+                try:
+                    result = await self._execute(job)
+                except Exception as e:
+                    # Транзакция откатилась, а агрегат мог измениться частично:
+                    # следующая команда загрузит матч из базы заново
+                    self._identity_map.clear()
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+
+                if self._mailbox.empty() and not self._is_live():
+                    logger.debug(f"Match actor {self.match_id} finished")
+                    break
+        finally:
+            self._on_exit(self)
+
+
+class MatchActorRegistry:
+    def __init__(
+        self,
+        uow_factory: UnitOfWorkFactory,
+        idle_timeout: float,
+        mailbox_size: int,
+    ):
+        self._uow_factory = uow_factory
+        self._idle_timeout = idle_timeout
+        self._mailbox_size = mailbox_size
+        self._actors: dict[UUID, MatchActor] = {}
+
+    def __len__(self) -> int:
+        return len(self._actors)
+
+    def _get_or_spawn(self, match_id: UUID) -> MatchActor:
+        actor = self._actors.get(match_id)
+        if actor is None:
+            actor = MatchActor(
+                match_id,
+                self._uow_factory,
+                self._idle_timeout,
+                self._mailbox_size,
+                on_exit=self._retire,
+            )
+            self._actors[match_id] = actor
+        return actor
+
+    def _retire(self, actor: MatchActor) -> None:
+        if self._actors.get(actor.match_id) is actor:
+            del self._actors[actor.match_id]
+
+    async def ask(self, match_id: UUID, job: Job[T]) -> T:
+        actor = self._get_or_spawn(match_id)
+        return await actor.ask(job)
+
+    async def stop(self) -> None:
+        actors = list(self._actors.values())
+        await asyncio.gather(*(actor.stop() for actor in actors))
+        self._actors.clear()
+
+
+__all__ = [
+    "MatchActor",
+    "MatchActorRegistry",
+]
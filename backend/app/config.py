@@ -5,12 +5,18 @@ class Settings(BaseSettings):
     POSTGRES_URL: str
 
     KAFKA_URL: str
+    KAFKA_LINGER_MS: int = 20
+    KAFKA_MAX_BATCH_SIZE: int = 65536
+    KAFKA_COMPRESSION_TYPE: str | None = "lz4"
+    KAFKA_MAX_IN_FLIGHT: int = 10_000
 
     CLICKHOUSE_HOST: str
     CLICKHOUSE_PORT: int
     CLICKHOUSE_DB: str
     CLICKHOUSE_USER: str
     CLICKHOUSE_PASSWORD: str
+    CLICKHOUSE_POOL_SIZE: int = 8
+    REPORTS_CACHE_TTL: float = 5.0
 
     APP_HOST: str
     APP_PORT: int
@@ -32,9 +38,34 @@ class Settings(BaseSettings):
 
     ADVICE_MAX_LENGTH: int = 200
 
+    MATCH_ACTOR_IDLE_TIMEOUT: float = 300.0
+    MATCH_ACTOR_MAILBOX_SIZE: int = 256
+
+    MATCH_EVENTS_BATCH_SIZE: int = 500
+    MATCH_EVENTS_FLUSH_INTERVAL: float = 1.0
+    MATCH_EVENTS_MAX_BUFFER: int = 50_000
+    MATCH_EVENTS_RESERVE_TIMEOUT: float = 5.0
+    MATCH_EVENTS_DEAD_LETTER_PATH: str = "match_events_dead_letter.jsonl"
+    MATCH_SNAPSHOT_EVERY: int = 50
+
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 1.0
+
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_TTL_HOURS: int = 24
+
+    WS_SEND_QUEUE_SIZE: int = 64
+
     RABBITMQ_URL: str
+    RABBITMQ_PUBLISH_CHANNELS: int = 4
+    RABBITMQ_EVENTS_PERSISTENT: bool = True
     BOT_TO_BACKEND_QUEUE: str
     BOT_RESPONSES_QUEUE: str
+    BOT_REQUEST_PREFETCH: int = 64
+    BOT_REQUEST_WORKERS: int = 16
+    BOT_TO_BACKEND_SLOW_QUEUE: str = "bot_to_backend_slow"
+    BOT_SLOW_REQUEST_PREFETCH: int = 4
+    BOT_SLOW_REQUEST_WORKERS: int = 4
 
     model_config = SettingsConfigDict(
         env_file=".env",
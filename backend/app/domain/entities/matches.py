@@ -7,10 +7,18 @@ from app.domain.events import (
     MatchCompleted,
     MatchStarted,
     PointScored,
+    RallyRecorded,
     SetCompleted,
+    stable_event_id,
 )
 from app.domain.utils import now
-from app.domain.values.composites import MatchEvent, Rotation, Score, TeamComposition
+from app.domain.values.composites import (
+    MatchEvent,
+    MatchEventRecord,
+    Rotation,
+    Score,
+    TeamComposition,
+)
 from app.domain.values.identifiers import ChatID, MatchID
 from app.domain.values.primitives import (
     RotationPosition,
@@ -19,6 +27,9 @@ from app.domain.values.primitives import (
     TeamName,
 )
 
+_SETS_TO_WIN = 3
+_ZERO_SCORE = Score.trusted(ScoreValue.of(0), ScoreValue.of(0))
+
 
 @dataclass
 class Match:
@@ -37,18 +48,54 @@ class Match:
     score: Score
     rotation: Rotation
     chat_id: ChatID
-    
+    events_count: int = 0
+    sets_won_a: int = 0
+    sets_won_b: int = 0
+    winner: int | None = None
+
     set_scores: list[Score] = field(default_factory=list, repr=False)
     _events: list[MatchEvent] = field(default_factory=list, repr=False)
     _domain_events: list[DomainEvent] = field(default_factory=list, repr=False)
+    _pending_records: list[MatchEventRecord] = field(default_factory=list, repr=False)
+    _is_new: bool = field(default=False, repr=False)
+    _changes: set[str] = field(default_factory=set, repr=False)
 
     @property
     def domain_events(self) -> list[DomainEvent]:
         return self._domain_events.copy()
 
+    @property
+    def domain_events_count(self) -> int:
+        return len(self._domain_events)
+
+    def domain_events_since(self, offset: int) -> list[DomainEvent]:
+        return self._domain_events[offset:]
+
     def clear_domain_events(self) -> None:
         self._domain_events.clear()
 
+    @property
+    def pending_records(self) -> list[MatchEventRecord]:
+        return self._pending_records.copy()
+
+    def clear_pending_records(self) -> None:
+        self._pending_records.clear()
+
+    @property
+    def is_new(self) -> bool:
+        return self._is_new
+
+    @property
+    def changes(self) -> frozenset[str]:
+        return frozenset(self._changes)
+
+    def mark_persisted(self) -> None:
+        self._is_new = False
+        self._changes.clear()
+
+    def _touch(self, *fields: str) -> None:
+        self._changes.update(fields)
+
     @classmethod
     def start(
         cls,
@@ -57,36 +104,45 @@ class Match:
         composition_a: TeamComposition,
         composition_b: TeamComposition,
         chat_id: ChatID,
+        match_id: MatchID | None = None,
+        started_at: datetime | None = None,
     ) -> "Match":
-        match_id = MatchID.generate()
+        # match_id и started_at передаются при восстановлении истории матча
+        match_id = match_id or MatchID.generate()
+        started_at = started_at or now()
         status = MatchStatusEnum.LIVE
-        score = Score(a=ScoreValue(0), b=ScoreValue(0))
+        score = _ZERO_SCORE
         set_scores = []
-        rotation = Rotation(team_a=RotationPosition(1), team_b=RotationPosition(1))
+        rotation = Rotation(
+            team_a=RotationPosition.of(1),
+            team_b=RotationPosition.of(1),
+        )
         _events = []
         _domain_events = []
         instance = cls(
             id=match_id,
-            created_at=now(),
-            updated_at=now(),
+            created_at=started_at,
+            updated_at=started_at,
             status=status,
             team_a_name=team_a,
             team_b_name=team_b,
             composition_a=composition_a,
             composition_b=composition_b,
-            current_set=SetNumber(1),
+            current_set=SetNumber.of(1),
             score=score,
             set_scores=set_scores,
             rotation=rotation,
             chat_id=chat_id,
             _events=_events,
             _domain_events=_domain_events,
+            _is_new=True,
         )
         match_started = MatchStarted(
+            event_id=stable_event_id(match_id, "MatchStarted"),
             match_id=match_id,
             team_a=team_a,
             team_b=team_b,
-            occurred_at=now(),
+            occurred_at=started_at,
         )
         instance._domain_events.append(match_started)
         return instance
@@ -95,77 +151,126 @@ class Match:
         if self.status != MatchStatusEnum.LIVE:
             raise RuntimeError(f"Cannot record event: match status is {self.status}")
         self._events.append(event)
+        self.events_count += 1
+        self._touch("events_count")
+        set_winner = None
         if event.result == ResultEnum.SCORED:
             self.score = self.score.increment(event.team_id)
+            # Партия может закончиться только на выигранном очке
+            set_winner = self.score.set_winner()
             self.updated_at = now()
+            self._touch("score", "updated_at")
             point_scored = PointScored(
+                event_id=stable_event_id(self.id, f"PointScored:{self.events_count}"),
                 match_id=self.id,
                 team_id=event.team_id,
                 new_score_a=self.score.a,
                 new_score_b=self.score.b,
                 current_set=self.current_set,
-                occurred_at=now(),
+                occurred_at=event.timestamp.value,
             )
             self._domain_events.append(point_scored)
-        is_won, winner = self.score.is_set_won()
-        if is_won:
-            self.set_scores.append(self.score)
+        record = MatchEventRecord(
+            seq=self.events_count,
+            set_number=self.current_set,
+            score=self.score,
+            rotation=self.rotation,
+            event=event,
+        )
+        self._pending_records.append(record)
+        self._domain_events.append(self._rally_recorded(record))
+        if set_winner is not None:
+            self._finish_set(set_winner, event.timestamp.value)
 
-            set_completed = SetCompleted(
-                match_id=self.id,
-                set_number=self.current_set,
-                winner=winner,
-                final_score_a=self.score.a,
-                final_score_b=self.score.b,
-                occurred_at=now(),
-            )
-            self._domain_events.append(set_completed)
-
-            sets_won_a = 0
-            sets_won_b = 0
-            for set_score in self.set_scores:
-                if set_score.a > set_score.b:
-                    sets_won_a += 1
-                else:
-                    sets_won_b += 1
-
-            if sets_won_a >= 3 or sets_won_b >= 3:
-                winner = 1 if sets_won_a > sets_won_b else 2
-                self.complete(winner)
-            else:
-                self.current_set = SetNumber(self.current_set.value + 1)
-                self.score = Score(a=ScoreValue(0), b=ScoreValue(0))
-                rotation = self.rotation.next(1).next(2)
-                self.rotation = rotation
-                self.updated_at = now()
-
-    def complete(self, winner: int | None = None) -> None:
+    def _rally_recorded(self, record: MatchEventRecord) -> RallyRecorded:
+        event = record.event
+        return RallyRecorded(
+            event_id=stable_event_id(self.id, f"RallyRecorded:{record.seq}"),
+            match_id=self.id,
+            seq=record.seq,
+            set_number=record.set_number,
+            team_id=event.team_id,
+            player_number=event.player_id.value,
+            action_type=event.action_type,
+            result=event.result,
+            score_a=record.score.a,
+            score_b=record.score.b,
+            rotation_a=record.rotation.team_a,
+            rotation_b=record.rotation.team_b,
+            occurred_at=event.timestamp.value,
+        )
+
+    @property
+    def match_winner(self) -> int | None:
+        if self.sets_won_a >= _SETS_TO_WIN:
+            return 1
+        if self.sets_won_b >= _SETS_TO_WIN:
+            return 2
+        return None
+
+    def _finish_set(self, winner: int, occurred_at: datetime) -> None:
+        self.set_scores.append(self.score)
+        if winner == 1:
+            self.sets_won_a += 1
+        else:
+            self.sets_won_b += 1
+        self._touch("set_scores")
+
+        set_completed = SetCompleted(
+            event_id=stable_event_id(
+                self.id, f"SetCompleted:{self.current_set.value}"
+            ),
+            match_id=self.id,
+            set_number=self.current_set,
+            winner=winner,
+            final_score_a=self.score.a,
+            final_score_b=self.score.b,
+            occurred_at=occurred_at,
+        )
+        self._domain_events.append(set_completed)
+
+        match_winner = self.match_winner
+        if match_winner is not None:
+            self.complete(match_winner, occurred_at)
+        else:
+            self.current_set = SetNumber.of(self.current_set.value + 1)
+            self.score = _ZERO_SCORE
+            self.rotation = self.rotation.next(1).next(2)
+            self.updated_at = now()
+            self._touch("current_set", "score", "rotation", "updated_at")
+
+    def replay(self, events: list[MatchEvent]) -> None:
+        for event in events:
+            self.record_event(event)
+        if events:
+            self.updated_at = events[-1].timestamp.value
+            self._touch("updated_at")
+        self._domain_events.clear()
+        self._pending_records.clear()
+
+    def complete(
+        self, winner: int | None = None, occurred_at: datetime | None = None
+    ) -> None:
         if self.status != MatchStatusEnum.LIVE:
             raise RuntimeError(f"Cannot record event: match status is {self.status}")
         if winner is None:
-            sets_won_a = 0
-            sets_won_b = 0
-            for set_score in self.set_scores:
-                if set_score.a > set_score.b:
-                    sets_won_a += 1
-                else:
-                    sets_won_b += 1
-
-            if sets_won_a >= 3 or sets_won_b >= 3:
-                winner = 1 if sets_won_a > sets_won_b else 2
-            else:
+            winner = self.match_winner
+            if winner is None:
                 raise RuntimeError("Cannot determine winner: match not finished")
         self.status = MatchStatusEnum.COMPLETED
+        self.winner = winner
         self.updated_at = now()
+        self._touch("status", "winner", "updated_at")
 
         match_completed = MatchCompleted(
+            event_id=stable_event_id(self.id, "MatchCompleted"),
             match_id=self.id,
             winner=winner,
             total_sets=len(self.set_scores),
             final_set_scores=[
                 (set_score.a.value, set_score.b.value) for set_score in self.set_scores
             ],
-            occurred_at=now(),
+            occurred_at=occurred_at or now(),
         )
         self._domain_events.append(match_completed)
         return
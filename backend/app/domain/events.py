@@ -1,17 +1,32 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Protocol
+from uuid import UUID, uuid5
 
+from app.domain.enums import ActionTypeEnum, ResultEnum
 from app.domain.values.identifiers import MatchID
-from app.domain.values.primitives import ScoreValue, SetNumber, TeamName
+from app.domain.values.primitives import (
+    RotationPosition,
+    ScoreValue,
+    SetNumber,
+    TeamName,
+)
 
 
 class DomainEvent(Protocol):
+    event_id: UUID
     occurred_at: datetime
 
 
-@dataclass(frozen=True)
+def stable_event_id(match_id: MatchID, name: str) -> UUID:
+    # Один факт матча всегда получает один id: повторная доставка
+    # и переигрывание истории не плодят дубли в аналитике
+    return uuid5(match_id.value, name)
+
+
+@dataclass(frozen=True, slots=True)
 class MatchStarted:
+    event_id: UUID
     match_id: MatchID
     team_a: TeamName
     team_b: TeamName
@@ -20,6 +35,7 @@ class MatchStarted:
     def to_dict(self) -> dict:
         return {
             "type": "MatchStarted",
+            "event_id": str(self.event_id),
             "match_id": str(self.match_id.value),
             "team_a": self.team_a.value,
             "team_b": self.team_b.value,
@@ -27,8 +43,9 @@ class MatchStarted:
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PointScored:
+    event_id: UUID
     match_id: MatchID
     team_id: int
     new_score_a: ScoreValue
@@ -39,6 +56,7 @@ class PointScored:
     def to_dict(self) -> dict:
         return {
             "type": "PointScored",
+            "event_id": str(self.event_id),
             "match_id": str(self.match_id.value),
             "team_id": self.team_id,
             "new_score_a": self.new_score_a.value,
@@ -48,8 +66,44 @@ class PointScored:
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class RallyRecorded:
+    event_id: UUID
+    match_id: MatchID
+    seq: int
+    set_number: SetNumber
+    team_id: int
+    player_number: int
+    action_type: ActionTypeEnum
+    result: ResultEnum
+    score_a: ScoreValue
+    score_b: ScoreValue
+    rotation_a: RotationPosition
+    rotation_b: RotationPosition
+    occurred_at: datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "RallyRecorded",
+            "event_id": str(self.event_id),
+            "match_id": str(self.match_id.value),
+            "seq": self.seq,
+            "set_number": self.set_number.value,
+            "team_id": self.team_id,
+            "player_number": self.player_number,
+            "action_type": self.action_type.name,
+            "result": self.result.name,
+            "score_a": self.score_a.value,
+            "score_b": self.score_b.value,
+            "rotation_a": self.rotation_a.value,
+            "rotation_b": self.rotation_b.value,
+            "occurred_at": self.occurred_at.isoformat(),
+        }
+
+
+@dataclass(frozen=True, slots=True)
 class SetCompleted:
+    event_id: UUID
     match_id: MatchID
     set_number: SetNumber
     winner: int
@@ -60,6 +114,7 @@ class SetCompleted:
     def to_dict(self) -> dict:
         return {
             "type": "SetCompleted",
+            "event_id": str(self.event_id),
             "match_id": str(self.match_id.value),
             "set_number": self.set_number.value,
             "winner": self.winner,
@@ -69,8 +124,9 @@ class SetCompleted:
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MatchCompleted:
+    event_id: UUID
     match_id: MatchID
     winner: int
     total_sets: int
@@ -80,6 +136,7 @@ class MatchCompleted:
     def to_dict(self) -> dict:
         return {
             "type": "MatchCompleted",
+            "event_id": str(self.event_id),
             "match_id": str(self.match_id.value),
             "winner": self.winner,
             "total_sets": self.total_sets,
@@ -90,8 +147,10 @@ class MatchCompleted:
 
 __all__ = [
     "DomainEvent",
+    "stable_event_id",
     "MatchStarted",
     "PointScored",
+    "RallyRecorded",
     "SetCompleted",
     "MatchCompleted",
 ]
@@ -1,17 +1,39 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Generic, TypeVar
+from typing import Any, ClassVar, Generic, TypeVar
 
 VT = TypeVar("VT", bound=Any)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BaseValueObject(ABC, Generic[VT]):
     value: VT
 
+    _flyweights: ClassVar[dict[Any, "BaseValueObject"]] = {}
+
     def __post_init__(self):
         self.validate()
 
+    @classmethod
+    def of(cls, value: VT):
+        instance = cls._flyweights.get(value)
+        if instance is None:
+            instance = cls(value)
+        return instance
+
+    @classmethod
+    def trusted(cls, value: VT):
+        # Только для данных, которые мы сами записали: без validate()
+        instance = cls._flyweights.get(value)
+        if instance is None:
+            instance = object.__new__(cls)
+            object.__setattr__(instance, "value", value)
+        return instance
+
+    @classmethod
+    def register_flyweights(cls, values: range) -> None:
+        cls._flyweights = {value: cls(value) for value in values}
+
     @abstractmethod
     def validate(self): ...
 
@@ -3,11 +3,35 @@ from typing import Optional
 
 from app.domain.enums import ActionTypeEnum, ResultEnum
 from app.domain.values.identifiers import PlayerID
-from app.domain.values.primitives import PlayerNumber, RotationPosition, ScoreValue
+from app.domain.values.primitives import (
+    PlayerNumber,
+    RotationPosition,
+    ScoreValue,
+    SetNumber,
+)
 from app.domain.values.timestamps import Timestamp
 
+_SET_POINTS = 25
+_SET_MARGIN = 2
+_MAX_SCORE = 100
 
-@dataclass(frozen=True)
+
+def _set_winner(a: int, b: int) -> int | None:
+    if a >= _SET_POINTS and a - b >= _SET_MARGIN:
+        return 1
+    if b >= _SET_POINTS and b - a >= _SET_MARGIN:
+        return 2
+    return None
+
+
+# Победитель партии для каждого счёта 0.._MAX_SCORE, 0 - партия продолжается
+_SET_WINNERS: tuple[bytes, ...] = tuple(
+    bytes(_set_winner(a, b) or 0 for b in range(_MAX_SCORE + 1))
+    for a in range(_MAX_SCORE + 1)
+)
+
+
+@dataclass(frozen=True, slots=True)
 class Score:
     a: ScoreValue
     b: ScoreValue
@@ -18,27 +42,33 @@ class Score:
         if not isinstance(self.b, ScoreValue):
             raise TypeError("Score.b must be ScoreValue")
 
+    @classmethod
+    def trusted(cls, a: ScoreValue, b: ScoreValue) -> "Score":
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "a", a)
+        object.__setattr__(instance, "b", b)
+        return instance
+
     def increment(self, team: int) -> "Score":
         if team == 1:
-            return Score(a=ScoreValue(self.a.value + 1), b=self.b)
+            return Score.trusted(ScoreValue.of(self.a.value + 1), self.b)
         elif team == 2:
-            return Score(a=self.a, b=ScoreValue(self.b.value + 1))
+            return Score.trusted(self.a, ScoreValue.of(self.b.value + 1))
         else:
             raise ValueError("Team must be 1 or 2")
 
+    def set_winner(self) -> Optional[int]:
+        return _SET_WINNERS[self.a.value][self.b.value] or None
+
     def is_set_won(self) -> tuple[bool, Optional[int]]:
-        a, b = self.a.value, self.b.value
-        if a >= 25 and a - b >= 2:
-            return True, 1
-        if b >= 25 and b - a >= 2:
-            return True, 2
-        return False, None
+        winner = self.set_winner()
+        return winner is not None, winner
 
     def as_dict(self) -> dict:
         return {"a": self.a.value, "b": self.b.value}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Rotation:
     team_a: RotationPosition
     team_b: RotationPosition
@@ -49,23 +79,30 @@ class Rotation:
         if not isinstance(self.team_b, RotationPosition):
             raise TypeError("Rotation.team_b must be RotationPosition")
 
+    @classmethod
+    def trusted(cls, team_a: RotationPosition, team_b: RotationPosition) -> "Rotation":
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "team_a", team_a)
+        object.__setattr__(instance, "team_b", team_b)
+        return instance
+
     def next(self, team: int) -> "Rotation":
         if team == 1:
             previous_position_a = self.team_a.value
             new_position_a = previous_position_a + 1
             if new_position_a > 6:
                 new_position_a = 1
-            new_team_a = RotationPosition(new_position_a)
+            new_team_a = RotationPosition.of(new_position_a)
             new_team_b = self.team_b
-            return Rotation(new_team_a, new_team_b)
+            return Rotation.trusted(new_team_a, new_team_b)
         elif team == 2:
             previous_position_b = self.team_b.value
             new_position_b = previous_position_b + 1
             if new_position_b > 6:
                 new_position_b = 1
             new_team_a = self.team_a
-            new_team_b = RotationPosition(new_position_b)
-            return Rotation(new_team_a, new_team_b)
+            new_team_b = RotationPosition.of(new_position_b)
+            return Rotation.trusted(new_team_a, new_team_b)
         else:
             raise ValueError("Team must be 1 or 2")
 
@@ -73,7 +110,7 @@ class Rotation:
         return {"team_a": self.team_a.value, "team_b": self.team_b.value}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TeamComposition:
     players: list[PlayerNumber]
 
@@ -85,6 +122,12 @@ class TeamComposition:
         if not all(isinstance(p, PlayerNumber) for p in self.players):
             raise TypeError("All players must be PlayerNumber")
 
+    @classmethod
+    def trusted(cls, players: list[PlayerNumber]) -> "TeamComposition":
+        instance = object.__new__(cls)
+        object.__setattr__(instance, "players", players)
+        return instance
+
     def has_player(self, number: PlayerNumber) -> bool:
         if number in self.players:
             return True
@@ -97,7 +140,7 @@ class TeamComposition:
         return [p.value for p in self.players]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MatchEvent:
     timestamp: Timestamp
     player_id: PlayerID
@@ -124,9 +167,19 @@ class MatchEvent:
         }
 
 
+@dataclass(frozen=True, slots=True)
+class MatchEventRecord:
+    seq: int
+    set_number: SetNumber
+    score: Score
+    rotation: Rotation
+    event: MatchEvent
+
+
 __all__ = [
     "Score",
     "Rotation",
     "TeamComposition",
     "MatchEvent",
+    "MatchEventRecord",
 ]
@@ -4,7 +4,7 @@ from uuid import UUID, uuid4
 from app.domain.values.base import BaseValueObject
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MatchID(BaseValueObject):
     value: UUID
 
@@ -20,7 +20,7 @@ class MatchID(BaseValueObject):
         return self.value
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlayerID(BaseValueObject):
     value: int
 
@@ -32,7 +32,7 @@ class PlayerID(BaseValueObject):
         return self.value
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChatID(BaseValueObject):
     value: int
 
@@ -44,6 +44,9 @@ class ChatID(BaseValueObject):
         return self.value
 
 
+PlayerID.register_flyweights(range(1, 100))
+
+
 __all__ = [
     "MatchID",
     "PlayerID",
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from app.domain.values.base import BaseValueObject
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlayerNumber(BaseValueObject):
     value: int
 
@@ -15,7 +15,7 @@ class PlayerNumber(BaseValueObject):
         return self.value
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TeamName(BaseValueObject):
     value: str
 
@@ -27,7 +27,7 @@ class TeamName(BaseValueObject):
         return self.value
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SetNumber(BaseValueObject):
     value: int
 
@@ -39,7 +39,7 @@ class SetNumber(BaseValueObject):
         return self.value
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScoreValue(BaseValueObject):
     value: int
 
@@ -51,7 +51,7 @@ class ScoreValue(BaseValueObject):
         return self.value
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RotationPosition(BaseValueObject):
     value: int
 
@@ -63,6 +63,12 @@ class RotationPosition(BaseValueObject):
         return self.value
 
 
+PlayerNumber.register_flyweights(range(1, 100))
+SetNumber.register_flyweights(range(1, 6))
+ScoreValue.register_flyweights(range(0, 101))
+RotationPosition.register_flyweights(range(1, 7))
+
+
 __all__ = [
     "PlayerNumber",
     "TeamName",
@@ -4,7 +4,7 @@ from datetime import datetime
 from app.domain.values.base import BaseValueObject
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Timestamp(BaseValueObject):
     value: datetime
 
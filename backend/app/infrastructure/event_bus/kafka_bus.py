@@ -1,44 +1,96 @@
-import dataclasses
+import asyncio
 import json
-import re
+import logging
 
 from aiokafka import AIOKafkaProducer
 
 from app.domain.events import DomainEvent
-from app.infrastructure.event_bus.encoder import DomainEventEncoder
+from app.infrastructure.repositories.outbox_repository import event_topic
+
+logger = logging.getLogger(__name__)
+
+KafkaMessage = tuple[str, bytes | None, bytes]
 
 
 class KafkaEventBus:
-    def __init__(self, bootstrap_servers: str):
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        linger_ms: int = 0,
+        max_batch_size: int = 16384,
+        compression_type: str | None = None,
+        max_in_flight: int = 10_000,
+    ):
         self._bootstrap_servers = bootstrap_servers
+        self._linger_ms = linger_ms
+        self._max_batch_size = max_batch_size
+        self._compression_type = compression_type
+        # Ограничивает число неподтверждённых сообщений: при переполнении
+        # send ждёт, пока брокер не подтвердит часть отправленных
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._pending: set[asyncio.Future] = set()
         self._producer = None
         self._started = False
 
     def _get_topic(self, event: DomainEvent) -> str:
-        event_name = type(event).__name__
-        pattern = re.compile(r"(?<!^)(?=[A-Z])")
-        return pattern.sub("-", event_name).lower()
+        return event_topic(event)
+
+    def _get_key(self, event: DomainEvent) -> bytes:
+        return str(event.match_id.value).encode("utf-8")
 
     def _serialize(self, event: DomainEvent) -> bytes:
-        event_dict = dataclasses.asdict(event)
-        json_bytes = json.dumps(event_dict, cls=DomainEventEncoder).encode("utf-8")
-        return json_bytes
+        return json.dumps(event.to_dict()).encode("utf-8")
 
     async def start(self) -> None:
-        self._producer = AIOKafkaProducer(bootstrap_servers=self._bootstrap_servers)
+        self._producer = AIOKafkaProducer(
+            bootstrap_servers=self._bootstrap_servers,
+            linger_ms=self._linger_ms,
+            max_batch_size=self._max_batch_size,
+            compression_type=self._compression_type,
+        )
         await self._producer.start()
         self._started = True
 
     async def stop(self) -> None:
         if self._started:
+            if self._pending:
+                await asyncio.gather(*self._pending, return_exceptions=True)
             await self._producer.stop()
             self._started = False
 
-    async def publish(self, events: list[DomainEvent]) -> None:
+    def _on_delivered(self, future: asyncio.Future) -> None:
+        self._pending.discard(future)
+        self._in_flight.release()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Kafka delivery failed: {future.exception()}")
+
+    async def send(self, topic: str, key: bytes | None, value: bytes) -> asyncio.Future:
         if not self._started:
             await self.start()
+        await self._in_flight.acquire()
+        try:
+            delivery = await self._producer.send(topic, value=value, key=key)
+        except Exception:
+            self._in_flight.release()
+            raise
+        self._pending.add(delivery)
+        delivery.add_done_callback(self._on_delivered)
+        return delivery
+
+    async def publish(self, events: list[DomainEvent]) -> None:
         for event in events:
-            topic = self._get_topic(event)
-            data = self._serialize(event)
-            await self._producer.send(topic, value=data)
-        await self._producer.flush()
+            await self.send(
+                self._get_topic(event), self._get_key(event), self._serialize(event)
+            )
+
+    async def publish_messages(self, messages: list[KafkaMessage]) -> None:
+        deliveries = [
+            await self.send(topic, key, value) for topic, key, value in messages
+        ]
+        await asyncio.gather(*deliveries)
+
+
+__all__ = [
+    "KafkaEventBus",
+    "KafkaMessage",
+]
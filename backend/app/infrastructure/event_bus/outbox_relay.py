@@ -0,0 +1,104 @@
+import asyncio
+import logging
+
+from asyncpg import Connection, Pool
+
+from app.infrastructure.event_bus.kafka_bus import KafkaEventBus
+from app.infrastructure.event_bus.rabbitmq_bus import RabbitMQEventBus
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    _CHANNEL = "outbox"
+
+    def __init__(
+        self,
+        pool: Pool,
+        kafka_bus: KafkaEventBus,
+        rabbitmq_bus: RabbitMQEventBus | None,
+        batch_size: int,
+        poll_interval: float,
+    ):
+        self._pool = pool
+        self._kafka_bus = kafka_bus
+        self._rabbitmq_bus = rabbitmq_bus
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._listen_conn: Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._listen_conn = await self._pool.acquire()
+        await self._listen_conn.add_listener(self._CHANNEL, self._on_notify)
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._listen_conn is not None:
+            await self._listen_conn.remove_listener(self._CHANNEL, self._on_notify)
+            await self._pool.release(self._listen_conn)
+            self._listen_conn = None
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self._wakeup.set()
+
+    async def relay_batch(self) -> int:
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                # Строки остаются заблокированными, пока брокеры не подтвердят
+                # доставку: при ошибке транзакция откатится и пачка уйдёт снова
+                rows = await conn.fetch(
+                    """
+                    SELECT id, aggregate_id, topic, payload FROM outbox
+                    ORDER BY id
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    self._batch_size,
+                )
+                if not rows:
+                    return 0
+                bodies = [row["payload"].encode("utf-8") for row in rows]
+                # Ключ - id матча: события одного матча попадают в одну партицию
+                await self._kafka_bus.publish_messages(
+                    [
+                        (row["topic"], str(row["aggregate_id"]).encode("utf-8"), body)
+                        for row, body in zip(rows, bodies)
+                    ]
+                )
+                if self._rabbitmq_bus is not None:
+                    await self._rabbitmq_bus.publish_messages(bodies)
+                await conn.execute(
+                    "DELETE FROM outbox WHERE id = ANY($1::bigint[])",
+                    [row["id"] for row in rows],
+                )
+        logger.debug(f"Relayed {len(rows)} outbox events")
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await self.relay_batch() == self._batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Failed to relay outbox events: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+__all__ = [
+    "OutboxRelay",
+]
@@ -1,40 +1,95 @@
+import asyncio
 import json
 import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Awaitable, Callable
+from typing import AsyncIterator, Awaitable, Callable
 
 import aio_pika
 from aio_pika import DeliveryMode, Message
+from aio_pika.abc import AbstractChannel
 
 from app.config import settings
 from app.domain.events import DomainEvent
+from app.infrastructure.event_bus.worker_pool import ShardedWorkerPool
 
 logger = logging.getLogger(__name__)
 
+_EVENTS_QUEUE = "domain_events"
+
+
+@dataclass(frozen=True, slots=True)
+class ConsumerLane:
+    queue: str
+    prefetch: int
+    workers: int
+
+
+def bot_request_lanes() -> list[ConsumerLane]:
+    # Быстрые действия (счёт, матчи) и медленные (советы LLM) читаются
+    # из разных очередей, чтобы нагрузка на LLM не задерживала ввод счёта
+    return [
+        ConsumerLane(
+            settings.BOT_TO_BACKEND_QUEUE,
+            prefetch=settings.BOT_REQUEST_PREFETCH,
+            workers=settings.BOT_REQUEST_WORKERS,
+        ),
+        ConsumerLane(
+            settings.BOT_TO_BACKEND_SLOW_QUEUE,
+            prefetch=settings.BOT_SLOW_REQUEST_PREFETCH,
+            workers=settings.BOT_SLOW_REQUEST_WORKERS,
+        ),
+    ]
+
 
 class RabbitMQEventBus:
-    def __init__(self, url: str = settings.RABBITMQ_URL):
+    def __init__(
+        self,
+        url: str = settings.RABBITMQ_URL,
+        publish_channels: int = settings.RABBITMQ_PUBLISH_CHANNELS,
+    ):
         self._url = url
+        self._publish_channels_count = publish_channels
         self._connection = None
         self._channel = None
+        # События публикуются через отдельные каналы с publisher confirms,
+        # чтобы не конкурировать с каналами потребителей. Outbox удаляет строки
+        # сразу после подтверждения, поэтому события по умолчанию persistent
+        self._publish_channels: asyncio.Queue[AbstractChannel] = asyncio.Queue()
+        # Ответы боту идут через свой канал без confirms: бот сам повторяет
+        # запрос по таймауту, и ответ не должен ждать пачку событий
+        self._reply_channel: AbstractChannel | None = None
         self._started = False
-        self._consumer_tag = None
+        self._consumers: list[tuple[aio_pika.abc.AbstractQueue, str]] = []
+        self._worker_pools: list[ShardedWorkerPool] = []
 
     async def start(self):
         if self._started:
             return
         try:
             self._connection = await aio_pika.connect_robust(self._url)
-            self._channel = await self._connection.channel()
-            await self._channel.set_qos(prefetch_count=1)
+            self._channel = await self._connection.channel(publisher_confirms=False)
+            for _ in range(self._publish_channels_count):
+                channel = await self._connection.channel(publisher_confirms=True)
+                self._publish_channels.put_nowait(channel)
+            self._reply_channel = await self._connection.channel(
+                publisher_confirms=False
+            )
 
+            for lane in bot_request_lanes():
+                await self._channel.declare_queue(
+                    lane.queue,
+                    durable=True,
+                    auto_delete=False,
+                )
             await self._channel.declare_queue(
-                settings.BOT_TO_BACKEND_QUEUE,
+                settings.BOT_RESPONSES_QUEUE,
                 durable=True,
                 auto_delete=False,
             )
             await self._channel.declare_queue(
-                settings.BOT_RESPONSES_QUEUE,
+                _EVENTS_QUEUE,
                 durable=True,
                 auto_delete=False,
             )
@@ -47,6 +102,10 @@ class RabbitMQEventBus:
     async def stop(self):
         if not self._started:
             return
+        while not self._publish_channels.empty():
+            await self._publish_channels.get_nowait().close()
+        if self._reply_channel:
+            await self._reply_channel.close()
         if self._channel:
             await self._channel.close()
         if self._connection:
@@ -55,21 +114,61 @@ class RabbitMQEventBus:
         logger.info("RabbitMQ disconnected")
 
     async def publish(self, events: list[DomainEvent]):
-        """Publish domain events to Kafka (for analytics)"""
+        """Publish domain events to the domain_events queue"""
+        await self.publish_messages(
+            [json.dumps(event.to_dict()).encode("utf-8") for event in events]
+        )
+
+    @asynccontextmanager
+    async def _publish_channel(self) -> AsyncIterator[AbstractChannel]:
         if not self._started:
             await self.start()
-        
-        for event in events:
-            message = Message(
-                body=json.dumps(event.to_dict()).encode("utf-8"),
-                content_type="application/json",
-                delivery_mode=DeliveryMode.PERSISTENT,
-            )
-            await self._channel.default_exchange.publish(
-                message,
-                routing_key="domain_events",
+        channel = await self._publish_channels.get()
+        try:
+            yield channel
+        finally:
+            self._publish_channels.put_nowait(channel)
+
+    async def publish_messages(self, bodies: list[bytes]):
+        if not bodies:
+            return
+        delivery_mode = (
+            DeliveryMode.PERSISTENT
+            if settings.RABBITMQ_EVENTS_PERSISTENT
+            else DeliveryMode.NOT_PERSISTENT
+        )
+        async with self._publish_channel() as channel:
+            exchange = channel.default_exchange
+            # Публикуем пачку без ожидания каждого подтверждения по отдельности,
+            # брокер подтверждает её целиком
+            await asyncio.gather(
+                *(
+                    exchange.publish(
+                        Message(
+                            body=body,
+                            content_type="application/json",
+                            delivery_mode=delivery_mode,
+                        ),
+                        routing_key=_EVENTS_QUEUE,
+                    )
+                    for body in bodies
+                )
             )
-        logger.debug(f"Published {len(events)} domain events")
+        logger.debug(f"Published {len(bodies)} domain events")
+
+    async def reply(self, reply_to: str, correlation_id: str, payload: dict):
+        body = {"correlation_id": correlation_id, **payload}
+        message = Message(
+            body=json.dumps(body).encode("utf-8"),
+            correlation_id=correlation_id,
+            content_type="application/json",
+        )
+        if not self._started:
+            await self.start()
+        await self._reply_channel.default_exchange.publish(
+            message,
+            routing_key=reply_to,
+        )
 
     async def publish_to_bot(
         self,
@@ -79,56 +178,71 @@ class RabbitMQEventBus:
         match_id: str,
         reply_to: str,
     ):
-        if not self._started:
-            await self.start()
-
         payload = {
-            "correlation_id": correlation_id,
             "chat_id": chat_id,
             "advice": advice,
             "timestamp": datetime.now().isoformat(),
             "status": "success",
         }
-
-        message = Message(
-            body=json.dumps(payload).encode("utf-8"),
-            correlation_id=correlation_id,
-            content_type="application/json",
-            delivery_mode=DeliveryMode.PERSISTENT,
-        )
-        await self._channel.default_exchange.publish(
-            message,
-            routing_key=reply_to,
-        )
+        await self.reply(reply_to, correlation_id, payload)
         logger.debug(f"Published advice to bot: {correlation_id}")
 
+    @staticmethod
+    def _shard_key(body: dict):
+        # События одного матча (или чата) обрабатываются строго по порядку
+        return body.get("match_id") or body.get("chat_id") or body.get("correlation_id")
+
     async def consume_bot_requests(
         self,
         handler: Callable[[dict, aio_pika.IncomingMessage], Awaitable[None]],
     ):
         if not self._started:
             await self.start()
+        for lane in bot_request_lanes():
+            await self._consume_lane(lane, handler)
 
-        queue = await self._channel.get_queue(settings.BOT_TO_BACKEND_QUEUE)
-
-        async def on_message(message: aio_pika.IncomingMessage):
+    async def _consume_lane(
+        self,
+        lane: ConsumerLane,
+        handler: Callable[[dict, aio_pika.IncomingMessage], Awaitable[None]],
+    ):
+        # prefetch задаётся на канал, поэтому у каждой очереди свой канал
+        channel = await self._connection.channel()
+        await channel.set_qos(prefetch_count=lane.prefetch)
+        queue = await channel.get_queue(lane.queue)
+        # Очереди воркеров не ограничены: число неподтверждённых сообщений
+        # и так ограничено prefetch_count канала
+        workers = ShardedWorkerPool(lane.workers, name=f"{lane.queue}-worker")
+        workers.start()
+        self._worker_pools.append(workers)
+
+        async def process(body: dict, message: aio_pika.IncomingMessage):
             try:
-                body = json.loads(message.body.decode())
-                logger.debug(f"Received message: {body.get('action')}")
                 await handler(body, message)
                 await message.ack()
                 logger.debug(f"Message acknowledged")
-            except json.JSONDecodeError:
-                logger.error("Failed to decode message")
-                await message.reject(requeue=False)
             except Exception as e:
                 logger.error(f"Error processing message: {e}")
                 await message.reject(requeue=True)
 
-        self._consumer_tag = await queue.consume(on_message)
-        logger.info(f"Consuming from {settings.BOT_TO_BACKEND_QUEUE}")
+        async def on_message(message: aio_pika.IncomingMessage):
+            try:
+                body = json.loads(message.body.decode())
+            except json.JSONDecodeError:
+                logger.error("Failed to decode message")
+                await message.reject(requeue=False)
+                return
+            logger.debug(f"Received message: {body.get('action')}")
+            workers.submit(self._shard_key(body), lambda: process(body, message))
+
+        consumer_tag = await queue.consume(on_message)
+        self._consumers.append((queue, consumer_tag))
+        logger.info(f"Consuming from {lane.queue} with {lane.workers} workers")
 
     async def stop_consuming(self):
-        if self._consumer_tag and self._channel:
-            await self._channel.cancel(self._consumer_tag)
-            self._consumer_tag = None
+        for queue, consumer_tag in self._consumers:
+            await queue.cancel(consumer_tag)
+        self._consumers.clear()
+        for workers in self._worker_pools:
+            await workers.stop()
+        self._worker_pools.clear()
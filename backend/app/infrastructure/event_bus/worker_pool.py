@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class ShardedWorkerPool:
+    """Выполняет задачи с одинаковым ключом по порядку, с разными - параллельно."""
+
+    def __init__(self, workers: int, name: str = "worker"):
+        self._name = name
+        self._queues: list[asyncio.Queue[Job]] = [
+            asyncio.Queue() for _ in range(workers)
+        ]
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run(queue), name=f"{self._name}-{index}")
+            for index, queue in enumerate(self._queues)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, key: Hashable, job: Job) -> None:
+        self._queues[hash(key) % len(self._queues)].put_nowait(job)
+
+    async def _run(self, queue: asyncio.Queue[Job]) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"{self._name} job failed: {e}")
+            finally:
+                queue.task_done()
+
+
+__all__ = [
+    "ShardedWorkerPool",
+]
@@ -0,0 +1,110 @@
+import bisect
+from dataclasses import dataclass, field
+
+# Верхние границы корзин гистограммы задержек, мс
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1,
+    2,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+)
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    counts: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    )
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def quantile(self, q: float) -> float | None:
+        total = sum(self.counts)
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return LATENCY_BUCKETS_MS[index]
+                return self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        total = sum(self.counts)
+        buckets = {
+            f"le_{bound:g}": count
+            for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)
+        }
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "buckets": buckets,
+            "avg_ms": round(self.total_ms / total, 3) if total else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+@dataclass(slots=True)
+class ActionStats:
+    calls: int = 0
+    errors: int = 0
+    expired: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class ActionMetrics:
+    def __init__(self):
+        self._actions: dict[str, ActionStats] = {}
+
+    def _stats(self, action: str) -> ActionStats:
+        stats = self._actions.get(action)
+        if stats is None:
+            stats = self._actions[action] = ActionStats()
+        return stats
+
+    def observe(self, action: str, elapsed_ms: float, ok: bool = True) -> None:
+        stats = self._stats(action)
+        stats.calls += 1
+        if not ok:
+            stats.errors += 1
+        stats.latency.observe(elapsed_ms)
+
+    def expire(self, action: str) -> None:
+        self._stats(action).expired += 1
+
+    def snapshot(self) -> dict:
+        return {
+            action: {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "expired": stats.expired,
+                "latency": stats.latency.as_dict(),
+            }
+            for action, stats in sorted(self._actions.items())
+        }
+
+
+__all__ = [
+    "ActionMetrics",
+    "LatencyHistogram",
+]
@@ -0,0 +1,28 @@
+from asynch import Connection
+
+from app.infrastructure.repositories.clickhouse_events import to_columns
+
+
+class ClickHouseClient:
+    """Обёртка над соединением asynch для вставок блоками по колонкам.
+
+    Курсор asynch не умеет columnar=True, поэтому вставка идёт в нативное
+    соединение: пачка уходит по колонкам без построчной сборки.
+    """
+
+    def __init__(self, conn: Connection):
+        self._conn = conn
+
+    async def insert_columnar(self, query: str, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        await self._conn._connection.execute(query, to_columns(rows), columnar=True)
+
+    async def reconnect(self) -> None:
+        await self._conn.close()
+        await self._conn.connect()
+
+
+__all__ = [
+    "ClickHouseClient",
+]
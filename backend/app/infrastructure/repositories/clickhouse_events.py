@@ -0,0 +1,163 @@
+"""Строки match_events_log из payload доменных событий.
+
+Модуль не зависит от app.config: его импортирует и Kafka consumer.
+"""
+
+import json
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+# Порядок колонок match_events_log, в нём же собираются блоки для INSERT
+COLUMNS = (
+    "event_id",
+    "event_type",
+    "match_id",
+    "seq",
+    "set_number",
+    "team_id",
+    "player_number",
+    "action_type",
+    "result",
+    "score_a",
+    "score_b",
+    "rotation_a",
+    "rotation_b",
+    "winner",
+    "team_a",
+    "team_b",
+    "timestamp",
+)
+
+_DEFAULTS: dict[str, Any] = {
+    "seq": 0,
+    "set_number": 0,
+    "team_id": 0,
+    "player_number": 0,
+    "action_type": "",
+    "result": "",
+    "score_a": 0,
+    "score_b": 0,
+    "rotation_a": 0,
+    "rotation_b": 0,
+    "winner": 0,
+    "team_a": "",
+    "team_b": "",
+}
+
+INSERT_MATCH_EVENTS = f"INSERT INTO match_events_log ({', '.join(COLUMNS)}) VALUES"
+
+Mapper = Callable[[dict[str, Any]], tuple]
+
+# Для старых сообщений без event_id: id из содержимого, чтобы повторная
+# доставка того же сообщения давала тот же id
+_LEGACY_NAMESPACE = uuid.UUID("5f0c9a52-3a8e-4d8e-9a57-0c3f6e0b7d41")
+
+
+def parse_occurred_at(value: str | None) -> datetime:
+    if not value:
+        return datetime.now(UTC)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _event_id(data: dict[str, Any]) -> uuid.UUID:
+    if "event_id" in data:
+        return uuid.UUID(data["event_id"])
+    return uuid.uuid5(_LEGACY_NAMESPACE, json.dumps(data, sort_keys=True))
+
+
+def _row(event_type: str, data: dict[str, Any], **values: Any) -> tuple:
+    row = {
+        **_DEFAULTS,
+        "event_id": _event_id(data),
+        "event_type": event_type,
+        "match_id": uuid.UUID(data["match_id"]),
+        "timestamp": parse_occurred_at(data.get("occurred_at")),
+        **values,
+    }
+    return tuple(row[column] for column in COLUMNS)
+
+
+def map_match_started(data: dict[str, Any]) -> tuple:
+    return _row("MatchStarted", data, team_a=data["team_a"], team_b=data["team_b"])
+
+
+def map_rally_recorded(data: dict[str, Any]) -> tuple:
+    return _row(
+        "RallyRecorded",
+        data,
+        seq=data["seq"],
+        set_number=data["set_number"],
+        team_id=data["team_id"],
+        player_number=data["player_number"],
+        action_type=data["action_type"],
+        result=data["result"],
+        score_a=data["score_a"],
+        score_b=data["score_b"],
+        rotation_a=data["rotation_a"],
+        rotation_b=data["rotation_b"],
+    )
+
+
+def map_point_scored(data: dict[str, Any]) -> tuple:
+    return _row(
+        "PointScored",
+        data,
+        set_number=data["current_set"],
+        team_id=data["team_id"],
+        score_a=data["new_score_a"],
+        score_b=data["new_score_b"],
+    )
+
+
+def map_set_completed(data: dict[str, Any]) -> tuple:
+    return _row(
+        "SetCompleted",
+        data,
+        set_number=data["set_number"],
+        score_a=data["final_score_a"],
+        score_b=data["final_score_b"],
+        winner=data["winner"],
+    )
+
+
+def map_match_completed(data: dict[str, Any]) -> tuple:
+    return _row(
+        "MatchCompleted",
+        data,
+        set_number=data["total_sets"],
+        winner=data["winner"],
+    )
+
+
+MAPPERS: dict[str, Mapper] = {
+    "match-started": map_match_started,
+    "rally-recorded": map_rally_recorded,
+    "point-scored": map_point_scored,
+    "set-completed": map_set_completed,
+    "match-completed": map_match_completed,
+}
+
+
+def map_event(topic: str, data: dict[str, Any]) -> tuple:
+    return MAPPERS[topic](data)
+
+
+def map_message(topic: str, raw: bytes) -> tuple:
+    return map_event(topic, json.loads(raw.decode("utf-8")))
+
+
+def to_columns(rows: list[tuple]) -> list[list]:
+    return [list(column) for column in zip(*rows, strict=True)]
+
+
+__all__ = [
+    "COLUMNS",
+    "INSERT_MATCH_EVENTS",
+    "MAPPERS",
+    "map_event",
+    "map_message",
+    "parse_occurred_at",
+    "to_columns",
+]
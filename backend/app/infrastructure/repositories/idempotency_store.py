@@ -0,0 +1,114 @@
+import json
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from asyncpg import Connection
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyStore:
+    """Общий для процесса LRU ответов по ключам идемпотентности.
+
+    Источник истины - таблица idempotency_keys: ключ резервируется в той же
+    транзакции, что и сама команда (см. PostgresIdempotencyKeys). Здесь
+    только кэш уже сохранённых ответов и счётчик для чистки старых ключей.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        ttl_hours: int,
+        purge_every: int = 1000,
+    ):
+        self._capacity = capacity
+        self.ttl_hours = ttl_hours
+        self._purge_every = purge_every
+        self._saves = 0
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def cached(self, scoped_key: str) -> dict[str, Any] | None:
+        response = self._cache.get(scoped_key)
+        if response is not None:
+            self._cache.move_to_end(scoped_key)
+        return response
+
+    def remember(self, scoped_key: str, response: dict[str, Any]) -> None:
+        self._cache[scoped_key] = response
+        self._cache.move_to_end(scoped_key)
+        if len(self._cache) > self._capacity:
+            self._cache.popitem(last=False)
+
+    def purge_due(self) -> bool:
+        self._saves += 1
+        return self._saves % self._purge_every == 0
+
+
+class PostgresIdempotencyKeys:
+    def __init__(self, conn: Connection, store: IdempotencyStore | None = None):
+        self._conn = conn
+        self._store = store
+
+    @staticmethod
+    def _scoped(action: str, key: str) -> str:
+        return f"{action}:{key}"
+
+    async def reserve(self, action: str, key: str) -> bool:
+        # Резерв вставляется до команды: при коммите он фиксируется вместе
+        # с её результатом, при откате исчезает. Параллельный дубль ждёт
+        # на уникальном индексе и получает конфликт
+        scoped_key = self._scoped(action, key)
+        if self._store is not None and self._store.cached(scoped_key) is not None:
+            return False
+        reserved = await self._conn.fetchval(
+            """
+            INSERT INTO idempotency_keys (key, action)
+            VALUES ($1, $2)
+            ON CONFLICT (key) DO NOTHING
+            RETURNING TRUE
+            """,
+            scoped_key,
+            action,
+        )
+        return bool(reserved)
+
+    async def response(self, action: str, key: str) -> dict[str, Any] | None:
+        scoped_key = self._scoped(action, key)
+        if self._store is not None:
+            response = self._store.cached(scoped_key)
+            if response is not None:
+                return response
+        raw = await self._conn.fetchval(
+            "SELECT response FROM idempotency_keys WHERE key = $1", scoped_key
+        )
+        if raw is None:
+            return None
+        response = json.loads(raw)
+        if self._store is not None:
+            self._store.remember(scoped_key, response)
+        return response
+
+    async def save(self, action: str, key: str, response: dict[str, Any]) -> None:
+        scoped_key = self._scoped(action, key)
+        await self._conn.execute(
+            "UPDATE idempotency_keys SET response = $2 WHERE key = $1",
+            scoped_key,
+            json.dumps(response, default=str),
+        )
+        if self._store is None:
+            return
+        self._store.remember(scoped_key, response)
+        if self._store.purge_due():
+            result = await self._conn.execute(
+                "DELETE FROM idempotency_keys "
+                "WHERE created_at < NOW() - make_interval(hours => $1)",
+                self._store.ttl_hours,
+            )
+            logger.debug(f"Purged expired idempotency keys: {result}")
+
+
+__all__ = [
+    "IdempotencyStore",
+    "PostgresIdempotencyKeys",
+]
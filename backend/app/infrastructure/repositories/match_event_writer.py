@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import time
+from uuid import UUID
+
+import asyncpg
+from asyncpg import Pool
+
+from app.domain.values.composites import MatchEventRecord
+
+logger = logging.getLogger(__name__)
+
+# Ошибки, которые не исправит повторная попытка: плохая строка или схема
+_REJECTED = (
+    asyncpg.DataError,
+    asyncpg.IntegrityConstraintViolationError,
+    asyncpg.SyntaxOrAccessError,
+)
+
+
+class MatchEventsBackpressureError(RuntimeError):
+    """Буфер событий полон дольше допустимого: команду нужно отклонить."""
+
+
+def match_event_row(match_id: UUID, record: MatchEventRecord) -> tuple:
+    event = record.event
+    return (
+        match_id,
+        record.seq,
+        event.player_id.value,
+        event.team_id,
+        event.action_type.name,
+        event.result.name,
+        record.set_number.value,
+        record.score.a.value,
+        record.score.b.value,
+        record.rotation.team_a.value,
+        record.rotation.team_b.value,
+        event.timestamp.value,
+    )
+
+
+class MatchEventWriter:
+    """Пишет события матчей пачками через COPY.
+
+    Строки, которые Postgres отвергает, отделяются от пачки и уходят в
+    match_events_dead_letter (а если и туда не записать - в файл), чтобы
+    остальные события не застревали. Переполненный буфер не теряет строки:
+    unit of work ждёт места через reserve() до коммита.
+    """
+
+    _TABLE = "match_events"
+    _COLUMNS = (
+        "match_id",
+        "seq",
+        "player_number",
+        "team_id",
+        "action_type",
+        "result",
+        "set_number",
+        "score_a",
+        "score_b",
+        "rotation_a",
+        "rotation_b",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        pool: Pool,
+        batch_size: int,
+        flush_interval: float,
+        max_buffer: int,
+        reserve_timeout: float = 5.0,
+        dead_letter_path: str = "match_events_dead_letter.jsonl",
+    ):
+        self._pool = pool
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_buffer = max_buffer
+        self._reserve_timeout = reserve_timeout
+        self._dead_letter_path = dead_letter_path
+        self._buffer: list[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="match-event-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Cannot flush match events on shutdown: {e}")
+            self._write_dead_letter_file(self._buffer, f"shutdown: {e}")
+            self._buffer.clear()
+
+    async def reserve(self, count: int) -> None:
+        # Ждём, пока writer освободит место; иначе команда падает до коммита
+        deadline = time.monotonic() + self._reserve_timeout
+        if self._buffer and len(self._buffer) + count > self._max_buffer:
+            self._wakeup.set()
+        while self._buffer and len(self._buffer) + count > self._max_buffer:
+            self._drained.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise MatchEventsBackpressureError(
+                    f"Match event buffer is full ({len(self._buffer)} rows)"
+                )
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=remaining)
+            except TimeoutError:
+                pass
+
+    def add(self, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self._batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            try:
+                async with self._pool.acquire() as conn:
+                    rejected = await self._copy(conn, rows)
+                    if rejected:
+                        await self._dead_letter(conn, rejected)
+            except Exception:
+                # Postgres недоступен: пачка возвращается в начало буфера,
+                # а reserve() придерживает новые команды
+                self._buffer[:0] = rows
+                raise
+            finally:
+                self._drained.set()
+            logger.debug(f"Flushed {len(rows)} match events")
+
+    async def _copy(self, conn, rows: list[tuple]) -> list[tuple[tuple, str]]:
+        # COPY атомарен: отвергнутую пачку делим пополам, пока не найдём
+        # конкретные плохие строки
+        try:
+            await conn.copy_records_to_table(
+                self._TABLE,
+                records=rows,
+                columns=self._COLUMNS,
+            )
+        except _REJECTED as e:
+            if len(rows) == 1:
+                return [(rows[0], str(e))]
+            middle = len(rows) // 2
+            return await self._copy(conn, rows[:middle]) + await self._copy(
+                conn, rows[middle:]
+            )
+        return []
+
+    async def _dead_letter(self, conn, rejected: list[tuple[tuple, str]]) -> None:
+        logger.error(
+            f"Postgres rejected {len(rejected)} match events, "
+            f"moving them to dead letter: {rejected[0][1]}"
+        )
+        try:
+            await conn.executemany(
+                """
+                INSERT INTO match_events_dead_letter (match_id, seq, row, error)
+                VALUES ($1, $2, $3, $4)
+                """,
+                [
+                    (row[0], row[1], json.dumps(self._as_dict(row), default=str), error)
+                    for row, error in rejected
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Cannot write match events dead letter table: {e}")
+            for row, error in rejected:
+                self._write_dead_letter_file([row], error)
+
+    def _as_dict(self, row: tuple) -> dict:
+        return dict(zip(self._COLUMNS, row))
+
+    def _write_dead_letter_file(self, rows: list[tuple], error: str) -> None:
+        if not rows:
+            return
+        with open(self._dead_letter_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                record = {"row": self._as_dict(row), "error": error}
+                f.write(json.dumps(record, default=str) + "\n")
+        logger.error(f"Wrote {len(rows)} match events to {self._dead_letter_path}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._flush_interval
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush match events: {e}")
+
+
+__all__ = [
+    "MatchEventWriter",
+    "MatchEventsBackpressureError",
+    "match_event_row",
+]
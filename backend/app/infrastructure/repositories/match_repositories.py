@@ -4,10 +4,18 @@ import uuid
 from asyncpg import Pool
 from asyncpg.pgproto import pgproto
 
+from app.application.exeptions import ConflictError, NotFoundError
+from app.config import settings
 from app.domain.entities.matches import Match
-from app.domain.enums import MatchStatusEnum
-from app.domain.values.composites import Rotation, Score, TeamComposition
-from app.domain.values.identifiers import ChatID, MatchID
+from app.domain.enums import ActionTypeEnum, MatchStatusEnum, ResultEnum
+from app.domain.values.composites import (
+    MatchEvent,
+    MatchEventRecord,
+    Rotation,
+    Score,
+    TeamComposition,
+)
+from app.domain.values.identifiers import ChatID, MatchID, PlayerID
 from app.domain.values.primitives import (
     PlayerNumber,
     RotationPosition,
@@ -15,13 +23,122 @@ from app.domain.values.primitives import (
     SetNumber,
     TeamName,
 )
+from app.domain.values.timestamps import Timestamp
+from app.infrastructure.repositories.match_event_writer import match_event_row
+
+# Изменяемые поля агрегата и соответствующие им колонки matches
+_UPDATE_COLUMNS: dict[str, tuple[str, ...]] = {
+    "status": ("status",),
+    "winner": ("winner",),
+    "current_set": ("current_set",),
+    "score": ("score_a", "score_b"),
+    "set_scores": ("set_scores",),
+    "rotation": ("rotation_a", "rotation_b"),
+    "events_count": ("events_count",),
+    "updated_at": ("updated_at",),
+}
+_update_queries: dict[tuple[str, ...], str] = {}
+
+
+def event_from_row(row) -> MatchEvent:
+    team_id = row["team_id"]
+    if team_id == 1:
+        rotation = row["rotation_a"]
+    else:
+        rotation = row["rotation_b"]
+    return MatchEvent(
+        timestamp=Timestamp.trusted(row["timestamp"]),
+        player_id=PlayerID.trusted(row["player_number"]),
+        team_id=team_id,
+        action_type=ActionTypeEnum[row["action_type"]],
+        result=ResultEnum[row["result"]],
+        rotation=RotationPosition.trusted(rotation),
+    )
 
 
 class PostgresMatchRepository:
-    def __init__(self, pool: Pool):
+    def __init__(
+        self,
+        pool: Pool,
+        identity_map: dict[uuid.UUID, Match] | None = None,
+        staged_events: list[tuple] | None = None,
+        snapshot_every: int = settings.MATCH_SNAPSHOT_EVERY,
+    ):
         self._pool = pool
+        self._identity_map = identity_map
+        self._staged_events = staged_events
+        self._snapshot_every = snapshot_every
 
     async def add(self, match: Match) -> None:
+        # Смена статуса (например, ручное завершение) снимается отдельно:
+        # у такой команды может не быть новых событий
+        status_changed = not match.is_new and "status" in match.changes
+        if match.is_new:
+            await self._insert(match)
+            match.mark_persisted()
+        else:
+            await self._update(match)
+        if self._identity_map is not None:
+            self._identity_map[match.id.value] = match
+        records = match.pending_records
+        if status_changed or (records and self._snapshot_due(match, records)):
+            await self._save_snapshot(match)
+        self._stage_events(match, records)
+
+    def _snapshot_due(self, match: Match, records: list[MatchEventRecord]) -> bool:
+        if match.status != MatchStatusEnum.LIVE:
+            return True
+        if records[0].set_number != match.current_set:
+            return True
+        first_seq = records[0].seq
+        return match.events_count // self._snapshot_every > (
+            (first_seq - 1) // self._snapshot_every
+        )
+
+    async def _save_snapshot(self, match: Match) -> None:
+        set_scores = json.dumps(
+            [[set_score.a.value, set_score.b.value] for set_score in match.set_scores]
+        )
+        query = """
+            INSERT INTO match_snapshots (
+                match_id, seq, status, current_set, score_a, score_b,
+                set_scores, rotation_a, rotation_b, events_count, updated_at
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $2, $10)
+            ON CONFLICT (match_id, seq) DO UPDATE SET
+                status = EXCLUDED.status,
+                current_set = EXCLUDED.current_set,
+                score_a = EXCLUDED.score_a,
+                score_b = EXCLUDED.score_b,
+                set_scores = EXCLUDED.set_scores,
+                rotation_a = EXCLUDED.rotation_a,
+                rotation_b = EXCLUDED.rotation_b,
+                updated_at = EXCLUDED.updated_at
+        """
+        await self._pool.execute(
+            query,
+            str(match.id.value),
+            match.events_count,
+            match.status.name,
+            match.current_set.value,
+            match.score.a.value,
+            match.score.b.value,
+            set_scores,
+            match.rotation.team_a.value,
+            match.rotation.team_b.value,
+            match.updated_at,
+        )
+
+    def _stage_events(self, match: Match, records: list[MatchEventRecord]) -> None:
+        if not records:
+            return
+        if self._staged_events is not None:
+            match_id = match.id.value
+            self._staged_events.extend(
+                match_event_row(match_id, record) for record in records
+            )
+        match.clear_pending_records()
+
+    async def _insert(self, match: Match) -> None:
         match_id = str(match.id.value)
         chat_id = match.chat_id.value
         team_a_name = match.team_a_name.value
@@ -49,17 +166,10 @@ class PostgresMatchRepository:
                 id, chat_id, team_a_name, team_b_name,
                 composition_a, composition_b, status,
                 current_set, score_a, score_b, set_scores,
-                rotation_a, rotation_b, created_at, updated_at
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-            ON CONFLICT (id) DO UPDATE SET
-                status = EXCLUDED.status,
-                current_set = EXCLUDED.current_set,
-                score_a = EXCLUDED.score_a,
-                score_b = EXCLUDED.score_b,
-                set_scores = EXCLUDED.set_scores,
-                rotation_a = EXCLUDED.rotation_a,
-                rotation_b = EXCLUDED.rotation_b,
-                updated_at = EXCLUDED.updated_at
+                rotation_a, rotation_b, events_count, created_at, updated_at
+            ) VALUES (
+                $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16
+            )
         """
         await self._pool.execute(
             query,
@@ -76,79 +186,199 @@ class PostgresMatchRepository:
             set_scores,
             rotation_a,
             rotation_b,
+            match.events_count,
             created_at,
             updated_at,
         )
 
-    async def get(self, match_id: MatchID) -> Match | None:
+    async def _update(self, match: Match) -> None:
+        changes = tuple(name for name in _UPDATE_COLUMNS if name in match.changes)
+        if not changes:
+            return
+        query = _update_queries.get(changes)
+        if query is None:
+            columns = [column for name in changes for column in _UPDATE_COLUMNS[name]]
+            assignments = ", ".join(
+                f"{column} = ${position}"
+                for position, column in enumerate(columns, start=2)
+            )
+            query = f"UPDATE matches SET {assignments} WHERE id = $1"
+            _update_queries[changes] = query
+
+        args = [str(match.id.value)]
+        for name in changes:
+            args.extend(self._column_values(match, name))
+        await self._pool.execute(query, *args)
+        match.mark_persisted()
+
+    def _column_values(self, match: Match, name: str) -> tuple:
+        if name == "status":
+            return (match.status.name,)
+        if name == "winner":
+            return (match.winner,)
+        if name == "current_set":
+            return (match.current_set.value,)
+        if name == "score":
+            return (match.score.a.value, match.score.b.value)
+        if name == "set_scores":
+            set_scores = json.dumps([[s.a.value, s.b.value] for s in match.set_scores])
+            return (set_scores,)
+        if name == "rotation":
+            return (match.rotation.team_a.value, match.rotation.team_b.value)
+        if name == "events_count":
+            return (match.events_count,)
+        if name == "updated_at":
+            return (match.updated_at,)
+        raise ValueError(f"Unknown match field: {name}")
+
+    async def get(self, match_id: MatchID, at_seq: int | None = None) -> Match | None:
+        if at_seq is not None:
+            return await self._rebuild(match_id, at_seq)
+
+        if self._identity_map is not None:
+            cached = self._identity_map.get(match_id.value)
+            if cached is not None:
+                return cached
+
         match_uuid = str(match_id.value)
         query = "SELECT * FROM matches WHERE id=$1"
         row = await self._pool.fetchrow(query, match_uuid)
         if row is None:
             return None
 
+        match = self._match_from_row(row, row)
+        if self._identity_map is not None:
+            self._identity_map[match.id.value] = match
+        return match
+
+    async def _rebuild(self, match_id: MatchID, at_seq: int) -> Match | None:
+        # Только чтение состояния на момент at_seq, события не откатываются
+        match_uuid = str(match_id.value)
+        row = await self._pool.fetchrow("SELECT * FROM matches WHERE id=$1", match_uuid)
+        if row is None:
+            return None
+        if at_seq > row["events_count"]:
+            raise NotFoundError(
+                f"Match {match_uuid} has {row['events_count']} events, "
+                f"no state at seq {at_seq}"
+            )
+
+        snapshot_query = """
+            SELECT * FROM match_snapshots
+            WHERE match_id = $1 AND seq <= $2
+            ORDER BY seq DESC
+            LIMIT 1
+        """
+        snapshot = await self._pool.fetchrow(snapshot_query, match_uuid, at_seq)
+        match = self._match_from_row(row, snapshot)
+
+        events_query = """
+            SELECT seq, player_number, team_id, action_type, result,
+                rotation_a, rotation_b, timestamp
+            FROM match_events
+            WHERE match_id = $1 AND seq > $2 AND seq <= $3
+            ORDER BY seq ASC
+        """
+        event_rows = await self._pool.fetch(
+            events_query, match_uuid, match.events_count, at_seq
+        )
+        # Хвост может ещё лежать в буфере MatchEventWriter или уйти в
+        # dead letter: без него вернулось бы более раннее состояние
+        expected = at_seq - match.events_count
+        if len(event_rows) < expected:
+            raise ConflictError(
+                f"Match {match_uuid} history up to seq {at_seq} is incomplete: "
+                f"{len(event_rows)} of {expected} events after seq "
+                f"{match.events_count} are stored"
+            )
+        match.replay([event_from_row(event_row) for event_row in event_rows])
+        return match
+
+    def _match_from_row(self, row, state) -> Match:
+        # row - статичные поля матча, state - изменяемое состояние
+        # (строка matches или снимок); без снимка матч в начальном состоянии.
+        # Строки записаны нами же, поэтому value objects собираются без валидации
         raw_uuid = row["id"]
         if isinstance(raw_uuid, pgproto.UUID):
             python_uuid = uuid.UUID(bytes=raw_uuid.bytes)
         else:
             python_uuid = uuid.UUID(str(raw_uuid))
-        match_id = MatchID(python_uuid)
-        chat_id = ChatID(row["chat_id"])
-        team_a_name = TeamName(row["team_a_name"])
-        team_b_name = TeamName(row["team_b_name"])
+        match_id = MatchID.trusted(python_uuid)
+        chat_id = ChatID.trusted(row["chat_id"])
+        team_a_name = TeamName.trusted(row["team_a_name"])
+        team_b_name = TeamName.trusted(row["team_b_name"])
 
-        composition_raw_a = row["composition_a"]
-        composition_a = TeamComposition(
-            [PlayerNumber(comp) for comp in composition_raw_a]
+        composition_a = TeamComposition.trusted(
+            [PlayerNumber.trusted(comp) for comp in row["composition_a"]]
         )
-
-        composition_raw_b = row["composition_b"]
-        composition_b = TeamComposition(
-            [PlayerNumber(comp) for comp in composition_raw_b]
+        composition_b = TeamComposition.trusted(
+            [PlayerNumber.trusted(comp) for comp in row["composition_b"]]
         )
+        created_at = row["created_at"]
+
+        if state is None:
+            return Match(
+                id=match_id,
+                status=MatchStatusEnum.LIVE,
+                created_at=created_at,
+                updated_at=created_at,
+                team_a_name=team_a_name,
+                team_b_name=team_b_name,
+                composition_a=composition_a,
+                composition_b=composition_b,
+                current_set=SetNumber.trusted(1),
+                score=Score.trusted(ScoreValue.trusted(0), ScoreValue.trusted(0)),
+                rotation=Rotation.trusted(
+                    RotationPosition.trusted(1), RotationPosition.trusted(1)
+                ),
+                chat_id=chat_id,
+            )
 
-        status = MatchStatusEnum[row["status"]]
-        current_set = SetNumber(row["current_set"])
+        status = MatchStatusEnum[state["status"]]
+        current_set = SetNumber.trusted(state["current_set"])
 
-        score_value_a = ScoreValue(row["score_a"])
-        score_value_b = ScoreValue(row["score_b"])
-        score = Score(score_value_a, score_value_b)
+        score_value_a = ScoreValue.trusted(state["score_a"])
+        score_value_b = ScoreValue.trusted(state["score_b"])
+        score = Score.trusted(score_value_a, score_value_b)
 
-        parsed = json.loads(row["set_scores"])
+        parsed = json.loads(state["set_scores"])
         set_scores = []
+        sets_won_a = 0
         for pair in parsed:
-            a = pair[0]
-            b = pair[1]
-            score_value_a = ScoreValue(a)
-            score_value_b = ScoreValue(b)
-            score = Score(score_value_a, score_value_b)
-            set_scores.append(score)
-
-        rotation_position_a = RotationPosition(row["rotation_a"])
-        rotation_position_b = RotationPosition(row["rotation_b"])
-        rotation = Rotation(rotation_position_a, rotation_position_b)
-        created_at = row["created_at"]
-        updated_at = row["updated_at"]
+            a = ScoreValue.trusted(pair[0])
+            b = ScoreValue.trusted(pair[1])
+            set_scores.append(Score.trusted(a, b))
+            if pair[0] > pair[1]:
+                sets_won_a += 1
+
+        rotation_position_a = RotationPosition.trusted(state["rotation_a"])
+        rotation_position_b = RotationPosition.trusted(state["rotation_b"])
+        rotation = Rotation.trusted(rotation_position_a, rotation_position_b)
+        updated_at = state["updated_at"]
         _events = []
         _domain_events = []
-        match = Match(
-            match_id,
-            status,
-            created_at,
-            updated_at,
-            team_a_name,
-            team_b_name,
-            composition_a,
-            composition_b,
-            current_set,
-            score,
-            rotation,
-            chat_id,
-            set_scores,
-            _events,
-            _domain_events,
+        return Match(
+            id=match_id,
+            status=status,
+            created_at=created_at,
+            updated_at=updated_at,
+            team_a_name=team_a_name,
+            team_b_name=team_b_name,
+            composition_a=composition_a,
+            composition_b=composition_b,
+            current_set=current_set,
+            score=score,
+            rotation=rotation,
+            chat_id=chat_id,
+            events_count=state["events_count"],
+            sets_won_a=sets_won_a,
+            # Победитель хранится только в matches: снимок до завершения его не знает
+            winner=row["winner"] if status == MatchStatusEnum.COMPLETED else None,
+            sets_won_b=len(set_scores) - sets_won_a,
+            set_scores=set_scores,
+            _events=_events,
+            _domain_events=_domain_events,
         )
-        return match
 
     async def get_live_by_chat(self, chat_id: ChatID) -> Match | None:
         chat_id_value = chat_id.value
@@ -0,0 +1,39 @@
+import json
+import re
+
+from asyncpg import Connection
+
+from app.domain.events import DomainEvent
+
+_TOPIC_PATTERN = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def event_topic(event: DomainEvent) -> str:
+    return _TOPIC_PATTERN.sub("-", type(event).__name__).lower()
+
+
+class PostgresOutbox:
+    def __init__(self, conn: Connection):
+        self._conn = conn
+
+    async def add(self, events: list[DomainEvent]) -> None:
+        if not events:
+            return
+        rows = [
+            (
+                event.match_id.value,
+                event_topic(event),
+                json.dumps(event.to_dict()),
+            )
+            for event in events
+        ]
+        await self._conn.executemany(
+            "INSERT INTO outbox (aggregate_id, topic, payload) VALUES ($1, $2, $3)",
+            rows,
+        )
+
+
+__all__ = [
+    "PostgresOutbox",
+    "event_topic",
+]
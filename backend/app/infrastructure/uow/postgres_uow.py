@@ -1,45 +1,106 @@
+from uuid import UUID
+
 from asyncpg import Pool
 from asyncpg.transaction import Transaction
 
-from app.application.ports.event_bus import EventBus
+from app.application.ports.idempotency import IdempotencyKeys
+from app.application.ports.outbox import Outbox
 from app.application.ports.repository import MatchRepository
+from app.domain.entities.matches import Match
+from app.infrastructure.repositories.idempotency_store import (
+    IdempotencyStore,
+    PostgresIdempotencyKeys,
+)
+from app.infrastructure.repositories.match_event_writer import MatchEventWriter
 from app.infrastructure.repositories.match_repositories import PostgresMatchRepository
+from app.infrastructure.repositories.outbox_repository import PostgresOutbox
 
 
 class PostgresUnitOfWork:
-    def __init__(self, pool: Pool):
+    def __init__(
+        self,
+        pool: Pool,
+        identity_map: dict[UUID, Match] | None = None,
+        event_writer: MatchEventWriter | None = None,
+        idempotency_store: IdempotencyStore | None = None,
+    ):
         self._pool = pool
-        self._matches = PostgresMatchRepository(pool)
+        self._identity_map = identity_map
+        self._event_writer = event_writer
+        self._idempotency_store = idempotency_store
+        self._staged_events: list[tuple] = []
+        self._matches = self._make_matches(pool)
+        self._outbox = None
+        self._idempotency = None
         self._conn = None
         self._tx: Transaction = None
 
+    def _make_matches(self, conn) -> PostgresMatchRepository:
+        return PostgresMatchRepository(conn, self._identity_map, self._staged_events)
+
+    async def _reserve_events(self) -> None:
+        # До коммита: если writer не успевает, команда падает целиком,
+        # а не оставляет events_count без строк в match_events
+        if self._event_writer is not None and self._staged_events:
+            await self._event_writer.reserve(len(self._staged_events))
+
+    def _hand_off_events(self) -> None:
+        # События матча пишутся пачками через COPY уже после коммита
+        if self._event_writer is not None:
+            self._event_writer.add(self._staged_events)
+        self._staged_events.clear()
+
     def matches(self) -> MatchRepository:
         if self._conn is None:
             raise RuntimeError("UoW not started. Use async with")
         return self._matches
 
+    def outbox(self) -> Outbox:
+        if self._conn is None:
+            raise RuntimeError("UoW not started. Use async with")
+        return self._outbox
+
+    def idempotency(self) -> IdempotencyKeys:
+        if self._conn is None:
+            raise RuntimeError("UoW not started. Use async with")
+        return self._idempotency
+
     async def __aenter__(self):
         self._conn = await self._pool.acquire()
         self._tx = self._conn.transaction()
         await self._tx.start()
-        self._matches = PostgresMatchRepository(self._conn)
+        self._matches = self._make_matches(self._conn)
+        self._outbox = PostgresOutbox(self._conn)
+        self._idempotency = PostgresIdempotencyKeys(self._conn, self._idempotency_store)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         try:
-            if exc_type is not None:
-                await self._tx.rollback()
-            else:
+            if exc_type is None:
+                try:
+                    await self._reserve_events()
+                except Exception:
+                    await self._tx.rollback()
+                    self._staged_events.clear()
+                    raise
                 await self._tx.commit()
+                self._hand_off_events()
+            else:
+                await self._tx.rollback()
+                self._staged_events.clear()
         finally:
             await self._pool.release(self._conn)
             self._conn = None
             self._tx = None
             self._matches = None
+            self._outbox = None
+            self._idempotency = None
 
     async def commit(self) -> None:
         if self._tx:
+            await self._reserve_events()
             await self._tx.commit()
+            self._hand_off_events()
             self._tx = self._conn.transaction()
             await self._tx.start()
-            self._matches = PostgresMatchRepository(self._conn)
+            self._matches = self._make_matches(self._conn)
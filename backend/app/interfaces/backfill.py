@@ -0,0 +1,323 @@
+"""Переигрывание истории матчей из Postgres в Kafka или ClickHouse.
+
+Доменные события собираются заново через Match, поэтому получают те же
+детерминированные event_id, что и при живой записи: повторный прогон не
+создаёт дублей в аналитике.
+
+Run from backend/: python -m app.interfaces.backfill --sink kafka --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Protocol
+
+import asynch
+import asyncpg
+
+from app.config import settings
+from app.domain.entities.matches import Match
+from app.domain.enums import MatchStatusEnum
+from app.domain.events import DomainEvent
+from app.domain.values.composites import TeamComposition
+from app.domain.values.identifiers import ChatID, MatchID
+from app.domain.values.primitives import PlayerNumber, TeamName
+from app.infrastructure.event_bus.kafka_bus import KafkaEventBus
+from app.infrastructure.repositories.clickhouse_client import ClickHouseClient
+from app.infrastructure.repositories.clickhouse_events import (
+    INSERT_MATCH_EVENTS,
+    map_event,
+)
+from app.infrastructure.repositories.match_repositories import event_from_row
+from app.infrastructure.repositories.outbox_repository import event_topic
+
+logger = logging.getLogger(__name__)
+
+# Шард матча - последний байт id: воркеры читают непересекающиеся части
+_SHARD = "get_byte(uuid_send({column}), 15) % $1 = $2"
+
+_MATCHES_QUERY = f"""
+    SELECT id, chat_id, team_a_name, team_b_name, composition_a, composition_b,
+        status, winner, created_at, updated_at
+    FROM matches
+    WHERE {_SHARD.format(column="id")}
+        AND ($3::timestamptz IS NULL OR created_at >= $3)
+    ORDER BY id
+"""
+
+_EVENTS_QUERY = f"""
+    SELECT match_id, seq, player_number, team_id, action_type, result,
+        rotation_a, rotation_b, timestamp
+    FROM match_events
+    WHERE {_SHARD.format(column="match_id")}
+        AND ($3::timestamptz IS NULL
+            OR match_id IN (SELECT id FROM matches WHERE created_at >= $3))
+    ORDER BY match_id, seq
+"""
+
+
+def _as_uuid(value) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _composition(numbers: list[int]) -> TeamComposition:
+    return TeamComposition.trusted([PlayerNumber.trusted(n) for n in numbers])
+
+
+def rebuild_events(row, event_rows) -> list[DomainEvent]:
+    match = Match.start(
+        TeamName.trusted(row["team_a_name"]),
+        TeamName.trusted(row["team_b_name"]),
+        _composition(row["composition_a"]),
+        _composition(row["composition_b"]),
+        ChatID.trusted(row["chat_id"]),
+        match_id=MatchID.trusted(_as_uuid(row["id"])),
+        started_at=row["created_at"],
+    )
+    for event_row in event_rows:
+        match.record_event(event_from_row(event_row))
+    if row["status"] == MatchStatusEnum.COMPLETED.name and (
+        match.status == MatchStatusEnum.LIVE
+    ):
+        # Матч завершили вручную: победитель сохранён при завершении.
+        # У матчей, завершённых до появления колонки, он восстановлен
+        # миграцией по партиям; при ничьей по партиям его не узнать
+        winner = row["winner"]
+        if winner is None:
+            logger.warning(
+                f"Match {row['id']} completed without a recorded winner, "
+                "skipping MatchCompleted"
+            )
+        else:
+            match.complete(winner, row["updated_at"])
+    return match.domain_events
+
+
+class Sink(Protocol):
+    async def write(self, events: list[DomainEvent]) -> None: ...
+
+
+class KafkaSink:
+    def __init__(self, bus: KafkaEventBus):
+        self._bus = bus
+
+    async def write(self, events: list[DomainEvent]) -> None:
+        await self._bus.publish_messages(
+            [
+                (
+                    event_topic(event),
+                    str(event.match_id.value).encode("utf-8"),
+                    json.dumps(event.to_dict()).encode("utf-8"),
+                )
+                for event in events
+            ]
+        )
+
+
+class ClickHouseSink:
+    def __init__(self, pool: asynch.Pool):
+        self._pool = pool
+
+    async def write(self, events: list[DomainEvent]) -> None:
+        rows = [map_event(event_topic(event), event.to_dict()) for event in events]
+        async with self._pool.connection() as conn:
+            await ClickHouseClient(conn).insert_columnar(INSERT_MATCH_EVENTS, rows)
+
+
+class Progress:
+    def __init__(self):
+        self.matches = 0
+        self.events = 0
+        self.failed = 0
+        self._started = time.monotonic()
+
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return (
+            f"matches={self.matches} events={self.events} failed={self.failed} "
+            f"elapsed={elapsed:.1f}s "
+            f"rate={self.matches / elapsed:.0f} matches/s, "
+            f"{self.events / elapsed:.0f} events/s"
+        )
+
+
+class ShardReader:
+    """Два серверных курсора по одному шарду, слитые по match_id."""
+
+    def __init__(self, conn: asyncpg.Connection, args: tuple, fetch_size: int):
+        self._conn = conn
+        self._args = args
+        self._fetch_size = fetch_size
+        self._events: list = []
+        self._events_cursor = None
+        self._events_done = False
+
+    async def _next_events(self) -> bool:
+        if self._events_done:
+            return False
+        self._events = await self._events_cursor.fetch(self._fetch_size)
+        self._events_done = len(self._events) < self._fetch_size
+        return bool(self._events)
+
+    async def _take_events(self, match_id: uuid.UUID) -> list:
+        taken = []
+        while True:
+            if not self._events and not await self._next_events():
+                return taken
+            i = 0
+            while i < len(self._events):
+                event_match = _as_uuid(self._events[i]["match_id"])
+                if event_match > match_id:
+                    break
+                if event_match == match_id:
+                    taken.append(self._events[i])
+                i += 1
+            del self._events[:i]
+            if self._events:
+                return taken
+
+    async def __aiter__(self):
+        matches = await self._conn.cursor(_MATCHES_QUERY, *self._args)
+        self._events_cursor = await self._conn.cursor(_EVENTS_QUERY, *self._args)
+        while True:
+            rows = await matches.fetch(self._fetch_size)
+            for row in rows:
+                yield row, await self._take_events(_as_uuid(row["id"]))
+            if len(rows) < self._fetch_size:
+                return
+
+
+async def backfill_shard(
+    pool: asyncpg.Pool,
+    sink: Sink,
+    shard: int,
+    shards: int,
+    since: datetime | None,
+    batch_size: int,
+    fetch_size: int,
+    progress: Progress,
+) -> None:
+    batch: list[DomainEvent] = []
+    batch_matches = 0
+    async with pool.acquire() as conn:
+        # Серверные курсоры живут только внутри транзакции
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            reader = ShardReader(conn, (shards, shard, since), fetch_size)
+            async for row, event_rows in reader:
+                try:
+                    batch.extend(rebuild_events(row, event_rows))
+                except Exception as e:
+                    progress.failed += 1
+                    logger.error(f"Cannot rebuild match {row['id']}: {e}")
+                    continue
+                batch_matches += 1
+                if len(batch) >= batch_size:
+                    await sink.write(batch)
+                    progress.matches += batch_matches
+                    progress.events += len(batch)
+                    batch, batch_matches = [], 0
+    if batch:
+        await sink.write(batch)
+    progress.matches += batch_matches
+    progress.events += len(batch)
+
+
+async def _report(progress: Progress, every: float) -> None:
+    while True:
+        await asyncio.sleep(every)
+        logger.info(progress.report())
+
+
+async def run(args: argparse.Namespace) -> Progress:
+    pool = await asyncpg.create_pool(
+        dsn=settings.POSTGRES_URL, min_size=1, max_size=args.workers
+    )
+    closers = [pool.close]
+    if args.sink == "kafka":
+        bus = KafkaEventBus(
+            settings.KAFKA_URL,
+            linger_ms=settings.KAFKA_LINGER_MS,
+            max_batch_size=settings.KAFKA_MAX_BATCH_SIZE,
+            compression_type=settings.KAFKA_COMPRESSION_TYPE,
+            max_in_flight=settings.KAFKA_MAX_IN_FLIGHT,
+        )
+        await bus.start()
+        closers.append(bus.stop)
+        sink: Sink = KafkaSink(bus)
+    else:
+        clickhouse_pool = asynch.Pool(
+            minsize=1,
+            maxsize=args.workers,
+            host=settings.CLICKHOUSE_HOST,
+            port=settings.CLICKHOUSE_PORT,
+            database=settings.CLICKHOUSE_DB,
+            user=settings.CLICKHOUSE_USER,
+            password=settings.CLICKHOUSE_PASSWORD,
+        )
+        await clickhouse_pool.startup()
+        closers.append(clickhouse_pool.shutdown)
+        sink = ClickHouseSink(clickhouse_pool)
+
+    progress = Progress()
+    reporter = asyncio.create_task(_report(progress, args.report_every))
+    try:
+        await asyncio.gather(
+            *(
+                backfill_shard(
+                    pool,
+                    sink,
+                    shard,
+                    args.workers,
+                    args.since,
+                    args.batch_size,
+                    args.fetch_size,
+                    progress,
+                )
+                for shard in range(args.workers)
+            )
+        )
+    finally:
+        reporter.cancel()
+        for close in reversed(closers):
+            await close()
+    logger.info(f"Backfill finished: {progress.report()}")
+    return progress
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sink", choices=("kafka", "clickhouse"), required=True)
+    parser.add_argument(
+        "--workers", type=int, default=4, help="parallel Postgres shards"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=5000, help="events per sink write"
+    )
+    parser.add_argument(
+        "--fetch-size", type=int, default=1000, help="rows per cursor fetch"
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help="only matches created at or after this ISO timestamp",
+    )
+    parser.add_argument(
+        "--report-every", type=float, default=5.0, help="progress interval, s"
+    )
+    args = parser.parse_args()
+    if args.workers < 1 or args.workers > 256:
+        parser.error("--workers must be between 1 and 256")
+    return args
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,23 @@
+from app.interfaces.rabbitmq_handlers.advice import RequestAdviceAction
+from app.interfaces.rabbitmq_handlers.base import ActionHandler
+from app.interfaces.rabbitmq_handlers.matches import (
+    CompleteMatchAction,
+    CreateMatchAction,
+    GetLiveMatchAction,
+    GetMatchAction,
+    RecordEventAction,
+    RecordEventsAction,
+)
+from app.interfaces.rabbitmq_handlers.router import ActionRouter
+
+__all__ = [
+    "ActionHandler",
+    "ActionRouter",
+    "CompleteMatchAction",
+    "CreateMatchAction",
+    "GetLiveMatchAction",
+    "GetMatchAction",
+    "RecordEventAction",
+    "RecordEventsAction",
+    "RequestAdviceAction",
+]
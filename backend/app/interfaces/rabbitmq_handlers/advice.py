@@ -0,0 +1,48 @@
+from asyncpg import Pool
+
+from app.application.commands.request_advice import (
+    RequestAdviceCommand,
+    RequestAdviceHandler,
+)
+from app.application.services.advice_service import AdviceService
+from app.infrastructure.event_bus.rabbitmq_bus import RabbitMQEventBus
+from app.infrastructure.uow.postgres_uow import PostgresUnitOfWork
+from app.interfaces.rabbitmq_handlers.base import ActionHandler
+from app.interfaces.rabbitmq_handlers.schemas import RequestAdviceRequest
+
+
+class RequestAdviceAction(ActionHandler):
+    action = "request_advice"
+    schema = RequestAdviceRequest
+
+    def __init__(
+        self,
+        pool: Pool,
+        advice_service: AdviceService,
+        rabbitmq_bus: RabbitMQEventBus,
+    ):
+        self._pool = pool
+        self._advice_service = advice_service
+        self._rabbitmq_bus = rabbitmq_bus
+
+    async def handle(self, request: RequestAdviceRequest) -> None:
+        cmd = RequestAdviceCommand(
+            match_id=request.match_id,
+            chat_id=request.chat_id,
+            correlation_id=request.correlation_id,
+            reply_to=request.reply_to,
+        )
+        async with PostgresUnitOfWork(self._pool) as uow:
+            handler = RequestAdviceHandler(
+                uow=uow,
+                advice_service=self._advice_service,
+                event_bus=self._rabbitmq_bus,
+            )
+            # Совет отправляется боту самим обработчиком команды
+            await handler.handle(cmd)
+        return None
+
+
+__all__ = [
+    "RequestAdviceAction",
+]
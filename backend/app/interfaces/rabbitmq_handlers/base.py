@@ -1,10 +1,20 @@
-# from abc import ABC, abstractmethod
-# from typing import Any
+from abc import ABC, abstractmethod
+from typing import Any, ClassVar
 
-# from aio_pika import IncomingMessage
+from app.interfaces.rabbitmq_handlers.schemas import BotRequest
 
 
-# class MessageHandler(ABC):
-#     @abstractmethod
-#     async def handle(self, payload: dict[str, Any], message: IncomingMessage) -> None:
-#         pass
+class ActionHandler(ABC):
+    action: ClassVar[str]
+    schema: ClassVar[type[BotRequest]]
+    # Поля ответа по умолчанию, которые бот ожидает и при ошибке
+    error_defaults: ClassVar[dict[str, Any]] = {}
+
+    @abstractmethod
+    async def handle(self, request: BotRequest) -> dict[str, Any] | None:
+        """Возвращает тело ответа или None, если ответ уже отправлен."""
+
+
+__all__ = [
+    "ActionHandler",
+]
@@ -0,0 +1,225 @@
+from dataclasses import asdict
+from typing import Any
+
+from asyncpg import Pool
+
+from app.application.commands.end_match import (
+    CompleteMatchCommand,
+    CompleteMatchHandler,
+)
+from app.application.commands.record_event import RecordEventCommand, RecordEventHandler
+from app.application.commands.record_events import (
+    RecordEventsCommand,
+    RecordEventsHandler,
+)
+from app.application.commands.start_match import StartMatchCommand, StartMatchHandler
+from app.application.exeptions import ConflictError
+from app.application.ports.websocket_publisher import WebSocketPublisher
+from app.application.queries.dto import MatchDTO, MatchStateDTO
+from app.application.queries.matches import MatchQueries
+from app.application.services.idempotency import idempotent_job
+from app.application.services.match_actors import MatchActorRegistry
+from app.domain.entities.matches import Match
+from app.domain.values.identifiers import ChatID
+from app.infrastructure.repositories.idempotency_store import IdempotencyStore
+from app.infrastructure.uow.postgres_uow import PostgresUnitOfWork
+from app.interfaces.rabbitmq_handlers.base import ActionHandler
+from app.interfaces.rabbitmq_handlers.schemas import (
+    ChatRequest,
+    CompleteMatchRequest,
+    CreateMatchRequest,
+    MatchRequest,
+    RecordEventRequest,
+    RecordEventsRequest,
+)
+
+
+def match_dto_payload(dto: MatchDTO) -> dict[str, Any]:
+    return {
+        "id": str(dto.id),
+        "team_a_name": dto.team_a_name,
+        "team_b_name": dto.team_b_name,
+        "composition_a": dto.composition_a,
+        "composition_b": dto.composition_b,
+        "status": dto.status,
+        "created_at": dto.created_at.isoformat(),
+        "current_set": dto.current_set,
+        "score_a": dto.score_a,
+        "score_b": dto.score_b,
+    }
+
+
+def match_state_payload(state: MatchStateDTO) -> dict[str, Any]:
+    payload = asdict(state)
+    payload["match_id"] = str(state.match_id)
+    return payload
+
+
+class GetLiveMatchAction(ActionHandler):
+    action = "get_live_match"
+    schema = ChatRequest
+    error_defaults = {"matches": []}
+
+    def __init__(self, pool: Pool):
+        self._pool = pool
+
+    def _serialize_match(self, match: Match) -> dict[str, Any]:
+        composition_a = [p.value for p in match.composition_a.get_players()]
+        composition_b = [p.value for p in match.composition_b.get_players()]
+        return {
+            "id": str(match.id.value),
+            "team_a_name": match.team_a_name.value,
+            "team_b_name": match.team_b_name.value,
+            "composition_a": composition_a,
+            "composition_b": composition_b,
+            "status": match.status.name,
+            "created_at": match.created_at.isoformat(),
+            "current_set": match.current_set.value,
+            "score_a": match.score.a.value,
+            "score_b": match.score.b.value,
+            "rotation_a": match.rotation.team_a.value,
+            "rotation_b": match.rotation.team_b.value,
+        }
+
+    async def handle(self, request: ChatRequest) -> dict[str, Any]:
+        async with PostgresUnitOfWork(self._pool) as uow:
+            match = await uow.matches().get_live_by_chat(ChatID(request.chat_id))
+        matches = [self._serialize_match(match)] if match else []
+        return {"matches": matches}
+
+
+class GetMatchAction(ActionHandler):
+    action = "get_match"
+    schema = MatchRequest
+    error_defaults = {"match": None}
+
+    def __init__(self, pool: Pool):
+        self._queries = MatchQueries(pool)
+
+    async def handle(self, request: MatchRequest) -> dict[str, Any]:
+        match_dto = await self._queries.get_by_id(request.match_id)
+        return {"match": match_dto_payload(match_dto) if match_dto else None}
+
+
+class CreateMatchAction(ActionHandler):
+    action = "create_match"
+    schema = CreateMatchRequest
+
+    def __init__(self, pool: Pool, idempotency_store: IdempotencyStore | None = None):
+        self._pool = pool
+        self._idempotency_store = idempotency_store
+
+    async def handle(self, request: CreateMatchRequest) -> dict[str, Any]:
+        cmd = StartMatchCommand(
+            team_a_name=request.team_a_name,
+            team_b_name=request.team_b_name,
+            composition_a=request.composition_a,
+            composition_b=request.composition_b,
+            chat_id=request.chat_id,
+        )
+
+        async def job(uow):
+            result = await StartMatchHandler(uow).handle(cmd)
+            return {"match": match_dto_payload(result)}
+
+        uow = PostgresUnitOfWork(self._pool, idempotency_store=self._idempotency_store)
+        async with uow:
+            return await idempotent_job(self.action, request.idempotency_key, job)(uow)
+
+
+class RecordEventAction(ActionHandler):
+    action = "record_event"
+    schema = RecordEventRequest
+    error_defaults = {"match_state": None}
+
+    def __init__(self, actors: MatchActorRegistry, ws_publisher: WebSocketPublisher):
+        self._actors = actors
+        self._ws_publisher = ws_publisher
+
+    async def handle(self, request: RecordEventRequest) -> dict[str, Any]:
+        cmd = RecordEventCommand(
+            match_id=request.match_id,
+            player_number=request.player_number,
+            team_id=request.team_id,
+            action_type=request.action_type,
+            result=request.result,
+            timestamp=request.timestamp,
+        )
+
+        async def job(uow):
+            result = await RecordEventHandler(uow, self._ws_publisher).handle(cmd)
+            return {"match_state": match_state_payload(result)}
+
+        try:
+            return await self._actors.ask(
+                cmd.match_id,
+                idempotent_job(self.action, request.idempotency_key, job),
+            )
+        except ConflictError as e:
+            # Бот по этому ответу понимает, что матч уже завершён
+            return {
+                "error": str(e),
+                "match_state": {"status": "COMPLETED", "error": "match_completed"},
+            }
+
+
+class RecordEventsAction(ActionHandler):
+    action = "record_events"
+    schema = RecordEventsRequest
+    error_defaults = {"match_state": None, "results": []}
+
+    def __init__(self, actors: MatchActorRegistry, ws_publisher: WebSocketPublisher):
+        self._actors = actors
+        self._ws_publisher = ws_publisher
+
+    async def handle(self, request: RecordEventsRequest) -> dict[str, Any]:
+        cmd = RecordEventsCommand(
+            match_id=request.match_id,
+            events=[
+                RecordEventCommand(match_id=request.match_id, **event.model_dump())
+                for event in request.events
+            ],
+        )
+
+        async def job(uow):
+            result = await RecordEventsHandler(uow, self._ws_publisher).handle(cmd)
+            return {
+                "match_state": match_state_payload(result.match_state),
+                "results": [asdict(r) for r in result.results],
+            }
+
+        return await self._actors.ask(
+            cmd.match_id, idempotent_job(self.action, request.idempotency_key, job)
+        )
+
+
+class CompleteMatchAction(ActionHandler):
+    action = "complete_match"
+    schema = CompleteMatchRequest
+
+    def __init__(self, actors: MatchActorRegistry, ws_publisher: WebSocketPublisher):
+        self._actors = actors
+        self._ws_publisher = ws_publisher
+
+    async def handle(self, request: CompleteMatchRequest) -> dict[str, Any]:
+        cmd = CompleteMatchCommand(match_id=request.match_id, winner=request.winner)
+
+        async def job(uow):
+            result = await CompleteMatchHandler(uow, self._ws_publisher).handle(cmd)
+            payload = asdict(result)
+            payload["match_id"] = str(result.match_id)
+            return {"result": payload}
+
+        return await self._actors.ask(
+            cmd.match_id, idempotent_job(self.action, request.idempotency_key, job)
+        )
+
+
+__all__ = [
+    "GetLiveMatchAction",
+    "GetMatchAction",
+    "CreateMatchAction",
+    "RecordEventAction",
+    "RecordEventsAction",
+    "CompleteMatchAction",
+]
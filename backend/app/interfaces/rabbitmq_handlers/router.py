@@ -0,0 +1,107 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.application.exeptions import ApplicationError, DuplicateRequestError
+from app.infrastructure.event_bus.rabbitmq_bus import RabbitMQEventBus
+from app.infrastructure.metrics import ActionMetrics
+from app.interfaces.rabbitmq_handlers.base import ActionHandler
+
+logger = logging.getLogger(__name__)
+
+
+class ActionRouter:
+    def __init__(
+        self,
+        rabbitmq_bus: RabbitMQEventBus,
+        metrics: ActionMetrics,
+    ):
+        self._rabbitmq_bus = rabbitmq_bus
+        self._metrics = metrics
+        self._handlers: dict[str, ActionHandler] = {}
+
+    @property
+    def actions(self) -> list[str]:
+        return list(self._handlers)
+
+    def register(self, handler: ActionHandler) -> None:
+        if handler.action in self._handlers:
+            raise ValueError(f"Handler for {handler.action} already registered")
+        self._handlers[handler.action] = handler
+
+    @staticmethod
+    def _is_expired(payload: dict[str, Any]) -> bool:
+        deadline = payload.get("deadline")
+        if not deadline:
+            return False
+        try:
+            deadline_at = datetime.fromisoformat(deadline)
+        except (TypeError, ValueError):
+            return False
+        if deadline_at.tzinfo is None:
+            deadline_at = deadline_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) >= deadline_at
+
+    async def dispatch(self, payload: dict[str, Any], message=None) -> None:
+        action = payload.get("action")
+        correlation_id = payload.get("correlation_id")
+        reply_to = payload.get("reply_to")
+        logger.debug(f"Bot request {action}: {payload}")
+
+        handler = self._handlers.get(action)
+        if handler is None:
+            logger.warning(f"Unknown action: {action}")
+            return
+        if not correlation_id or not reply_to:
+            logger.error(f"Missing correlation_id or reply_to for {action}")
+            return
+        if self._is_expired(payload):
+            # Бот уже перестал ждать ответ: не тратим базу и LLM
+            self._metrics.expire(action)
+            logger.info(f"Dropping expired {action} request {correlation_id}")
+            return
+
+        started = time.perf_counter()
+        ok = True
+        try:
+            request = handler.schema.model_validate(payload)
+            reply = await handler.handle(request)
+        except ValidationError as e:
+            ok = False
+            problems = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                for error in e.errors(include_url=False, include_input=False)
+            )
+            logger.warning(f"Invalid {action} payload: {problems}")
+            reply = {**handler.error_defaults, "error": f"Invalid request: {problems}"}
+        except DuplicateRequestError as e:
+            # Не ошибка команды: она уже применена, бот не должен решить,
+            # что матч завершён
+            logger.info(f"{action}: {e}")
+            reply = {**handler.error_defaults, "error": "duplicate_request"}
+        except ApplicationError as e:
+            ok = False
+            logger.warning(f"{action} failed: {type(e).__name__}: {e}")
+            reply = {**handler.error_defaults, "error": str(e)}
+        except Exception as e:
+            ok = False
+            logger.error(f"Error handling {action}: {e}", exc_info=True)
+            reply = {**handler.error_defaults, "error": f"Internal error: {e}"}
+
+        if reply is not None:
+            try:
+                await self._rabbitmq_bus.reply(reply_to, correlation_id, reply)
+            except Exception as e:
+                ok = False
+                logger.error(f"Failed to reply to {action}: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._metrics.observe(action, elapsed_ms, ok)
+        logger.debug(f"Handled {action} in {elapsed_ms:.1f} ms")
+
+
+__all__ = [
+    "ActionRouter",
+]
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+
+class BotRequest(BaseModel):
+    action: str
+    correlation_id: str
+    reply_to: str
+    deadline: datetime | None = None
+    idempotency_key: str | None = Field(default=None, max_length=200)
+
+
+class ChatRequest(BotRequest):
+    chat_id: int
+
+
+class MatchRequest(BotRequest):
+    match_id: UUID
+
+
+class CreateMatchRequest(ChatRequest):
+    team_a_name: str = Field(min_length=1)
+    team_b_name: str = Field(min_length=1)
+    composition_a: list[int] = Field(min_length=1)
+    composition_b: list[int] = Field(min_length=1)
+
+
+class RequestAdviceRequest(MatchRequest):
+    chat_id: int
+
+
+class EventItem(BaseModel):
+    player_number: int
+    team_id: int
+    action_type: str
+    result: str
+    timestamp: datetime | None = None
+
+    @field_validator("timestamp")
+    @classmethod
+    def _assume_utc(cls, value: datetime | None) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class RecordEventRequest(MatchRequest, EventItem):
+    pass
+
+
+class RecordEventsRequest(MatchRequest):
+    events: list[EventItem] = Field(min_length=1, max_length=500)
+
+
+class CompleteMatchRequest(MatchRequest):
+    winner: int | None = None
+
+
+__all__ = [
+    "BotRequest",
+    "ChatRequest",
+    "MatchRequest",
+    "CreateMatchRequest",
+    "RequestAdviceRequest",
+    "EventItem",
+    "RecordEventRequest",
+    "RecordEventsRequest",
+    "CompleteMatchRequest",
+]
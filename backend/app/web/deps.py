@@ -1,31 +1,48 @@
 from fastapi import Depends, Request
 
 from app.application.queries.matches import MatchQueries
+from app.application.queries.reports import ReportQueries
 from app.application.services.advice_service import AdviceService
 from app.application.services.context_builder import ContextBuilder
+from app.application.services.match_actors import MatchActorRegistry
 from app.application.services.prompt_templates import PromptTemplates
 from app.config import settings
 from app.infrastructure.event_bus.kafka_bus import KafkaEventBus
 from app.infrastructure.event_bus.rabbitmq_bus import RabbitMQEventBus
 from app.infrastructure.external.ollama_client import OllamaClient
 from app.infrastructure.uow.postgres_uow import PostgresUnitOfWork
+from app.web.ws.ws_publisher import FastAPIWebSocketPublisher
 
 
 def get_uow(request: Request) -> PostgresUnitOfWork:
     pool = request.app.state.postgres_pool
-    return PostgresUnitOfWork(pool)
+    return PostgresUnitOfWork(
+        pool, idempotency_store=request.app.state.idempotency_store
+    )
 
 
 def get_event_bus(request: Request) -> KafkaEventBus:
     return request.app.state.event_bus
 
 
+def get_match_actors(request: Request) -> MatchActorRegistry:
+    return request.app.state.match_actors
+
+
+def get_ws_publisher(request: Request) -> FastAPIWebSocketPublisher:
+    return request.app.state.ws_publisher
+
+
 def get_queries(request: Request) -> MatchQueries:
     conn = request.app.state.postgres_pool
     queries = MatchQueries(conn)
     return queries
 
 
+def get_report_queries(request: Request) -> ReportQueries:
+    return request.app.state.report_queries
+
+
 def get_uow_with_events(request: Request) -> tuple[PostgresUnitOfWork, KafkaEventBus]:
     uow = get_uow(request)
     event_bus = get_event_bus(request)
@@ -1,8 +1,13 @@
 import logging
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from app.application.exeptions import DuplicateRequestError
 from app.config import settings
+from app.infrastructure.repositories.match_event_writer import (
+    MatchEventsBackpressureError,
+)
 from app.web.lifespan import lifespan
 from app.web.routers import health, matches, reports, ws
 
@@ -18,6 +23,23 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+
+@app.exception_handler(MatchEventsBackpressureError)
+async def match_events_backpressure(
+    request: Request, exc: MatchEventsBackpressureError
+):
+    # Команда откатилась целиком: клиент может безопасно повторить её
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(DuplicateRequestError)
+async def duplicate_request(request: Request, exc: DuplicateRequestError):
+    # Команда с этим Idempotency-Key уже применена, ответ на неё не сохранён
+    return JSONResponse(status_code=409, content={"detail": "duplicate_request"})
+
+
 app.include_router(matches.router, prefix="/api")
 app.include_router(reports.router, prefix="/api")
 app.include_router(health.router, prefix="/api")
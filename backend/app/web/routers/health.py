@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -6,3 +6,9 @@ router = APIRouter(prefix="/health", tags=["health"])
 @router.get("/")
 async def health_check():
     return {"status": "ok"}
+
+
+@router.get("/metrics")
+async def bot_metrics(request: Request):
+    metrics = getattr(request.app.state, "bot_metrics", None)
+    return {"bot_actions": metrics.snapshot() if metrics else {}}
@@ -1,28 +1,45 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 
 from app.application.commands.end_match import (
     CompleteMatchCommand,
     CompleteMatchHandler,
 )
 from app.application.commands.record_event import RecordEventCommand, RecordEventHandler
+from app.application.commands.record_events import (
+    RecordEventsCommand,
+    RecordEventsHandler,
+)
 from app.application.commands.start_match import StartMatchCommand, StartMatchHandler
+from app.application.exeptions import ConflictError, NotFoundError
+from app.application.ports.uow import UnitOfWork
+from app.application.ports.websocket_publisher import WebSocketPublisher
 from app.application.queries.dto import MatchDTO, MatchResultDTO, MatchStateDTO
 from app.application.queries.matches import MatchQueries
 from app.application.services.advice_service import AdviceService
+from app.application.services.idempotency import idempotent_job
+from app.application.services.match_actors import MatchActorRegistry
 from app.domain.values.identifiers import MatchID
-from app.infrastructure.event_bus.kafka_bus import KafkaEventBus
 from app.infrastructure.uow.postgres_uow import PostgresUnitOfWork
-from app.web.deps import get_advice_service, get_event_bus, get_queries, get_uow
+from app.web.deps import (
+    get_advice_service,
+    get_match_actors,
+    get_queries,
+    get_uow,
+    get_ws_publisher,
+)
 from app.web.schemas.advice import AdviceResponse
 from app.web.schemas.matches import (
     CompleteMatchSchema,
+    MatchBatchStateResponse,
     MatchResponse,
     MatchResultResponse,
     MatchStateResponse,
     RecordEventSchema,
+    RecordEventsSchema,
     StartMatchSchema,
 )
 
@@ -33,11 +50,10 @@ router = APIRouter(prefix="/matches", tags=["matches"])
 async def create_match(
     schema: StartMatchSchema,
     uow: PostgresUnitOfWork = Depends(get_uow),
-    event_bus: KafkaEventBus = Depends(get_event_bus),
 ):
     async with uow:
         command = StartMatchCommand(**schema.model_dump())
-        handler = StartMatchHandler(uow, event_bus)
+        handler = StartMatchHandler(uow)
         return await handler.handle(command)
 
 
@@ -59,33 +75,92 @@ async def get_match(match_id: UUID, queries: MatchQueries = Depends(get_queries)
     return result
 
 
+@router.get("/{match_id}/state", response_model=MatchStateResponse)
+async def get_match_state(
+    match_id: UUID,
+    at_seq: int | None = Query(default=None, ge=0),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+):
+    # at_seq - состояние сразу после события с этим номером:
+    # ближайший снимок плюс хвост match_events
+    try:
+        async with uow:
+            match = await uow.matches().get(MatchID(match_id), at_seq=at_seq)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ConflictError as e:
+        # Хвост событий ещё не записан (или ушёл в dead letter)
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    if match is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return MatchStateDTO.from_domain(match, changes=[])
+
+
 @router.post("/{match_id}/events", response_model=MatchStateResponse)
 async def record_event(
     match_id: UUID,
     schema: RecordEventSchema,
-    uow: PostgresUnitOfWork = Depends(get_uow),
-    event_bus: KafkaEventBus = Depends(get_event_bus),
+    actors: MatchActorRegistry = Depends(get_match_actors),
+    ws_publisher: WebSocketPublisher = Depends(get_ws_publisher),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ):
-    async with uow:
-        command = RecordEventCommand(match_id=match_id, **schema.model_dump())
-        handler = RecordEventHandler(uow, event_bus)
-        return await handler.handle(command)
+    command = RecordEventCommand(match_id=match_id, **schema.model_dump())
+
+    async def job(uow: UnitOfWork):
+        handler = RecordEventHandler(uow, ws_publisher)
+        return jsonable_encoder(await handler.handle(command))
+
+    # Повтор запроса с тем же Idempotency-Key получает сохранённый ответ
+    return await actors.ask(
+        match_id, idempotent_job("record_event", idempotency_key, job)
+    )
+
+
+@router.post("/{match_id}/events:batch", response_model=MatchBatchStateResponse)
+async def record_events(
+    match_id: UUID,
+    schema: RecordEventsSchema,
+    actors: MatchActorRegistry = Depends(get_match_actors),
+    ws_publisher: WebSocketPublisher = Depends(get_ws_publisher),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    command = RecordEventsCommand(
+        match_id=match_id,
+        events=[
+            RecordEventCommand(match_id=match_id, **event.model_dump())
+            for event in schema.events
+        ],
+    )
+
+    async def job(uow: UnitOfWork):
+        handler = RecordEventsHandler(uow, ws_publisher)
+        return jsonable_encoder(await handler.handle(command))
+
+    return await actors.ask(
+        match_id, idempotent_job("record_events", idempotency_key, job)
+    )
 
 
 @router.post("/{match_id}/complete", response_model=MatchResultResponse)
 async def complete_match(
     match_id: UUID,
     schema: CompleteMatchSchema,
-    uow: PostgresUnitOfWork = Depends(get_uow),
-    event_bus: KafkaEventBus = Depends(get_event_bus),
+    actors: MatchActorRegistry = Depends(get_match_actors),
+    ws_publisher: WebSocketPublisher = Depends(get_ws_publisher),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ):
-    async with uow:
-        command = CompleteMatchCommand(
-            match_id=match_id,
-            winner=schema.winner,
-        )
-        handler = CompleteMatchHandler(uow, event_bus)
-        return await handler.handle(command)
+    command = CompleteMatchCommand(
+        match_id=match_id,
+        winner=schema.winner,
+    )
+
+    async def job(uow: UnitOfWork):
+        handler = CompleteMatchHandler(uow, ws_publisher)
+        return jsonable_encoder(await handler.handle(command))
+
+    return await actors.ask(
+        match_id, idempotent_job("complete_match", idempotency_key, job)
+    )
 
 
 @router.get("/{match_id}/advice", response_model=AdviceResponse)
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.application.queries.matches import MatchQueries
-from app.web.deps import get_queries
+from app.application.queries.reports import ReportQueries
+from app.web.deps import get_queries, get_report_queries
 from app.web.schemas.matches import MatchResponse
+from app.web.schemas.reports import (
+    MatchReportResponse,
+    PlayerStatsResponse,
+    TeamReportResponse,
+)
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -12,3 +20,38 @@ async def get_reports(
     queries: MatchQueries = Depends(get_queries),
 ):
     return await queries.get_live()
+
+
+@router.get("/matches", response_model=list[MatchReportResponse])
+async def get_match_reports(
+    limit: int = Query(default=50, ge=1, le=500),
+    reports: ReportQueries = Depends(get_report_queries),
+):
+    return await reports.recent_matches(limit)
+
+
+@router.get("/matches/{match_id}", response_model=MatchReportResponse)
+async def get_match_report(
+    match_id: UUID,
+    reports: ReportQueries = Depends(get_report_queries),
+):
+    result = await reports.match_report(match_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Match report not found")
+    return result
+
+
+@router.get("/matches/{match_id}/players", response_model=list[PlayerStatsResponse])
+async def get_player_stats(
+    match_id: UUID,
+    reports: ReportQueries = Depends(get_report_queries),
+):
+    return await reports.player_stats(match_id)
+
+
+@router.get("/teams/{team_name}", response_model=TeamReportResponse)
+async def get_team_report(
+    team_name: str,
+    reports: ReportQueries = Depends(get_report_queries),
+):
+    return await reports.team_report(team_name)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class StartMatchSchema(BaseModel):
@@ -20,6 +20,10 @@ class RecordEventSchema(BaseModel):
     timestamp: datetime | None = None
 
 
+class RecordEventsSchema(BaseModel):
+    events: list[RecordEventSchema] = Field(min_length=1, max_length=500)
+
+
 class CompleteMatchSchema(BaseModel):
     winner: int | None = None
 
@@ -48,9 +52,27 @@ class MatchStateResponse(BaseModel):
     score_b: int
     rotation_a: int
     rotation_b: int
+    sets_won_a: int
+    sets_won_b: int
     changes: list[str]
 
 
+class EventResultResponse(BaseModel):
+    index: int
+    accepted: bool
+    seq: int | None = None
+    current_set: int | None = None
+    score_a: int | None = None
+    score_b: int | None = None
+    changes: list[str] = []
+    error: str | None = None
+
+
+class MatchBatchStateResponse(BaseModel):
+    match_state: MatchStateResponse
+    results: list[EventResultResponse]
+
+
 class MatchResultResponse(BaseModel):
     match_id: UUID
     winner: int
@@ -0,0 +1,50 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class TeamMatchStatsResponse(BaseModel):
+    team_id: int
+    rallies: int
+    scored: int
+    errors: int
+    points_won: int
+    sets_won: int
+
+
+class MatchReportResponse(BaseModel):
+    match_id: UUID
+    team_a_name: str
+    team_b_name: str
+    rallies: int
+    points_a: int
+    points_b: int
+    sets_a: int
+    sets_b: int
+    winner: int | None
+    started_at: datetime
+    updated_at: datetime
+    teams: list[TeamMatchStatsResponse] = []
+
+
+class PlayerStatsResponse(BaseModel):
+    team_id: int
+    player_number: int
+    actions: int
+    scored: int
+    errors: int
+    serves: int
+    attacks: int
+    blocks: int
+
+
+class TeamReportResponse(BaseModel):
+    team_name: str
+    matches: int
+    wins: int
+    sets_won: int
+    points_won: int
+    rallies: int
+    scored: int
+    errors: int
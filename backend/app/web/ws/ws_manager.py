@@ -1,60 +1,188 @@
+import asyncio
+import json
 import logging
+from collections import deque
+from collections.abc import Hashable
 from uuid import UUID
 
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# 1013 Try Again Later: клиент не успевает читать
+_SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Как в WebSocket.send_json у Starlette, но один раз на рассылку
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_message(data: dict) -> str:
+    return _encoder.encode(data)
+
+
+class ClientConnection:
+    """Подписчик с ограниченной очередью отправки и своей задачей-писателем.
+
+    send() только кладёт сообщение в очередь и никогда не ждёт сокет.
+    Когда очередь полна, новое сообщение заменяет ждущее с тем же ключом
+    (полное состояние матча делает старое ненужным); если заменить нечего,
+    клиент считается медленным и отключается.
+    """
+
+    def __init__(self, websocket: WebSocket, max_pending: int):
+        self.websocket = websocket
+        self._max_pending = max_pending
+        self._pending: deque[tuple[Hashable | None, str]] = deque()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="ws-writer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def send(self, message: str, key: Hashable | None = None) -> bool:
+        if self._closing:
+            return False
+        if len(self._pending) >= self._max_pending:
+            if key is None or not self._coalesce(key, message):
+                logger.warning("WS: Dropping slow client, send queue is full")
+                self._closing = True
+                self._pending.clear()
+                self._wakeup.set()
+                return False
+            return True
+        self._pending.append((key, message))
+        self._wakeup.set()
+        return True
+
+    def _coalesce(self, key: Hashable, message: str) -> bool:
+        for i in range(len(self._pending) - 1, -1, -1):
+            if self._pending[i][0] == key:
+                self._pending[i] = (key, message)
+                return True
+        return False
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    _, message = self._pending.popleft()
+                    await self.websocket.send_text(message)
+                if self._closing:
+                    await self.websocket.close(code=_SLOW_CONSUMER_CLOSE_CODE)
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._closing = True
+            self._pending.clear()
+            logger.error(f"WS: Failed to send to client: {e}")
+
 
 class ConnectionManager:
-    def __init__(self):
-        self._connections: dict[UUID, list[WebSocket]] = {}
-        self._all_matches_connections: list[WebSocket] = []
+    def __init__(self, max_pending: int = 64):
+        self._max_pending = max_pending
+        self._connections: dict[UUID, dict[WebSocket, ClientConnection]] = {}
+        self._all_matches_connections: dict[WebSocket, ClientConnection] = {}
+
+    def _open(self, websocket: WebSocket) -> ClientConnection:
+        connection = ClientConnection(websocket, self._max_pending)
+        connection.start()
+        return connection
 
     async def connect(self, websocket: WebSocket, match_id: UUID):
         await websocket.accept()
-        self._connections.setdefault(match_id, []).append(websocket)
-        logger.info(f"WS: Client connected to match {match_id}. Total connections: {len(self._connections[match_id])}")
+        subscribers = self._connections.setdefault(match_id, {})
+        subscribers[websocket] = self._open(websocket)
+        logger.info(
+            f"WS: Client connected to match {match_id}. "
+            f"Total connections: {len(subscribers)}"
+        )
 
     async def connect_all_matches(self, websocket: WebSocket):
         await websocket.accept()
-        self._all_matches_connections.append(websocket)
-        logger.info(f"WS: Client connected to all matches. Total connections: {len(self._all_matches_connections)}")
+        self._all_matches_connections[websocket] = self._open(websocket)
+        logger.info(
+            f"WS: Client connected to all matches. "
+            f"Total connections: {len(self._all_matches_connections)}"
+        )
 
     async def disconnect(self, websocket: WebSocket, match_id: UUID):
-        if match_id in self._connections:
-            self._connections[match_id].remove(websocket)
-            if not self._connections[match_id]:
-                del self._connections[match_id]
-            logger.info(f"WS: Client disconnected from match {match_id}. Remaining: {len(self._connections.get(match_id, []))}")
+        subscribers = self._connections.get(match_id)
+        if subscribers is None:
+            return
+        connection = subscribers.pop(websocket, None)
+        if not subscribers:
+            del self._connections[match_id]
+        if connection is not None:
+            await connection.stop()
+            logger.info(
+                f"WS: Client disconnected from match {match_id}. "
+                f"Remaining: {len(subscribers)}"
+            )
 
     async def disconnect_all_matches(self, websocket: WebSocket):
-        if websocket in self._all_matches_connections:
-            self._all_matches_connections.remove(websocket)
-            logger.info(f"WS: Client disconnected from all matches. Remaining: {len(self._all_matches_connections)}")
+        connection = self._all_matches_connections.pop(websocket, None)
+        if connection is not None:
+            await connection.stop()
+            logger.info(
+                f"WS: Client disconnected from all matches. "
+                f"Remaining: {len(self._all_matches_connections)}"
+            )
 
-    async def broadcast(self, match_id: UUID, data: dict):
-        if match_id not in self._connections:
-            logger.warning(f"WS: No subscribers for match {match_id}")
-            return
-        success_count = 0
-        for ws in self._connections[match_id]:
-            try:
-                await ws.send_json(data)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"WS: Failed to send to client: {e}")
-        logger.info(f"WS: Broadcast to match {match_id}: {success_count}/{len(self._connections[match_id])} clients")
+    async def stop(self) -> None:
+        connections = list(self._all_matches_connections.values())
+        for subscribers in self._connections.values():
+            connections.extend(subscribers.values())
+        self._connections.clear()
+        self._all_matches_connections.clear()
+        for connection in connections:
+            await connection.stop()
 
-    async def broadcast_all_matches(self, data: dict):
+    def has_subscribers(self, match_id: UUID) -> bool:
+        return bool(self._connections.get(match_id))
+
+    def has_all_matches_subscribers(self) -> bool:
+        return bool(self._all_matches_connections)
+
+    # Сообщения приходят уже сериализованными: один и тот же текстовый кадр
+    # уходит всем подписчикам без повторного кодирования
+    def broadcast(
+        self, match_id: UUID, message: str, key: Hashable | None = None
+    ) -> int:
+        subscribers = self._connections.get(match_id)
+        if not subscribers:
+            logger.debug(f"WS: No subscribers for match {match_id}")
+            return 0
+        queued = sum(
+            connection.send(message, key) for connection in subscribers.values()
+        )
+        logger.debug(
+            f"WS: Broadcast to match {match_id}: {queued}/{len(subscribers)} clients"
+        )
+        return queued
+
+    def broadcast_all_matches(self, message: str, key: Hashable | None = None) -> int:
         if not self._all_matches_connections:
-            logger.warning(f"WS: No subscribers for all matches")
-            return
-        success_count = 0
-        for ws in self._all_matches_connections:
-            try:
-                await ws.send_json(data)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"WS: Failed to send to client: {e}")
-        logger.info(f"WS: Broadcast to all matches: {success_count}/{len(self._all_matches_connections)} clients")
+            logger.debug("WS: No subscribers for all matches")
+            return 0
+        queued = sum(
+            connection.send(message, key)
+            for connection in self._all_matches_connections.values()
+        )
+        logger.debug(
+            f"WS: Broadcast to all matches: "
+            f"{queued}/{len(self._all_matches_connections)} clients"
+        )
+        return queued
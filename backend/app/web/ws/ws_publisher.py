@@ -2,23 +2,37 @@ import logging
 from uuid import UUID
 
 from app.application.ports.websocket_publisher import WebSocketPublisher
-from app.web.ws.ws_manager import ConnectionManager
+from app.domain.values.identifiers import MatchID
+from app.web.ws.ws_manager import ConnectionManager, encode_message
 
 logger = logging.getLogger(__name__)
 
 
+def match_update_message(match_id: UUID, message: str) -> str:
+    # {"type": "match_update", "match_id": ..., "data": ...} без повторной
+    # сериализации data: вкладываем уже готовый JSON
+    return f'{{"type":"match_update","match_id":"{match_id}","data":{message}}}'
+
+
 class FastAPIWebSocketPublisher(WebSocketPublisher):
     def __init__(self, manager: ConnectionManager):
         self._manager = manager
 
-    async def publish(self, match_id: UUID, data: dict):
-        logger.info(f"WS: Publishing to match {match_id}: {data}")
-        await self._manager.broadcast(match_id, data)
-        
-        broadcast_data = {
-            "type": "match_update",
-            "match_id": str(match_id),
-            "data": data
-        }
-        logger.info(f"WS: Broadcasting to all: {broadcast_data}")
-        await self._manager.broadcast_all_matches(broadcast_data)
+    async def publish(self, match_id: MatchID | UUID, data: dict):
+        # Хендлеры передают MatchID, а подписчики лежат в менеджере по UUID
+        if isinstance(match_id, MatchID):
+            match_id = match_id.value
+        # Только постановка в очереди подписчиков: отправляют писатели соединений
+        to_match = self._manager.has_subscribers(match_id)
+        to_all = self._manager.has_all_matches_subscribers()
+        if not (to_match or to_all):
+            return
+        logger.debug(f"WS: Publishing to match {match_id}: {data}")
+        message = encode_message(data)
+        if to_match:
+            self._manager.broadcast(match_id, message, key=(data.get("type"), match_id))
+        if to_all:
+            self._manager.broadcast_all_matches(
+                match_update_message(match_id, message),
+                key=("match_update", match_id),
+            )
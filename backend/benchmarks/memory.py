@@ -0,0 +1,90 @@
+"""Bytes per MatchEvent and per played-out Match.
+
+Run from backend/: python -m benchmarks.memory
+"""
+
+import random
+import tracemalloc
+from datetime import timedelta
+
+from app.domain.entities.matches import Match
+from app.domain.enums import ActionTypeEnum, ResultEnum
+from app.domain.utils import now
+from app.domain.values.composites import MatchEvent, TeamComposition
+from app.domain.values.identifiers import ChatID, PlayerID
+from app.domain.values.primitives import PlayerNumber, RotationPosition, TeamName
+from app.domain.values.timestamps import Timestamp
+
+EVENTS = 20_000
+MATCHES = 200
+
+
+def make_events(count: int) -> list[MatchEvent]:
+    rnd = random.Random(42)
+    start = now()
+    return [
+        MatchEvent(
+            Timestamp(start + timedelta(milliseconds=i)),
+            PlayerID.of(rnd.randint(1, 12)),
+            rnd.choice((1, 2)),
+            rnd.choice(list(ActionTypeEnum)),
+            rnd.choice(list(ResultEnum)),
+            RotationPosition.of(rnd.randint(1, 6)),
+        )
+        for i in range(count)
+    ]
+
+
+def play_match(rnd: random.Random) -> Match:
+    match = Match.start(
+        TeamName("Team A"),
+        TeamName("Team B"),
+        TeamComposition([PlayerNumber.of(n) for n in range(1, 7)]),
+        TeamComposition([PlayerNumber.of(n) for n in range(7, 13)]),
+        ChatID(1),
+    )
+    start = now()
+    i = 0
+    while match.status.name == "LIVE":
+        team_id = rnd.choice((1, 2))
+        match.record_event(
+            MatchEvent(
+                Timestamp(start + timedelta(seconds=i)),
+                PlayerID.of(rnd.randint(1, 12)),
+                team_id,
+                ActionTypeEnum.ATTACK,
+                rnd.choice((ResultEnum.SCORED, ResultEnum.NEUTRAL)),
+                RotationPosition.of(1),
+            )
+        )
+        i += 1
+    match.clear_domain_events()
+    match.clear_pending_records()
+    return match
+
+
+def measure(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size, result
+
+
+def main() -> None:
+    size, events = measure(lambda: make_events(EVENTS))
+    print(f"MatchEvent: {size / len(events):.0f} bytes/event ({len(events)} events)")
+
+    rnd = random.Random(7)
+    size, matches = measure(lambda: [play_match(rnd) for _ in range(MATCHES)])
+    rallies = sum(match.events_count for match in matches) / len(matches)
+    print(
+        f"Match: {size / len(matches):.0f} bytes/match "
+        f"({len(matches)} matches, {rallies:.0f} rallies each)"
+    )
+
+
+if __name__ == "__main__":
+    main()
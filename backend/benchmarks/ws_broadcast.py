@@ -0,0 +1,152 @@
+"""Cost of one WebSocket broadcast to 5k subscribers of a single match.
+
+Compares the old path (each writer calls send_json, so the payload is encoded
+once per subscriber) with encode-once: the manager queues one pre-encoded
+text frame for every subscriber.
+
+The encode-once run goes through FastAPIWebSocketPublisher with a MatchID,
+like the command handlers, while subscribers connect by UUID as the
+WebSocket route does.
+
+Run from backend/: python -m benchmarks.ws_broadcast
+"""
+
+import asyncio
+import time
+import uuid
+
+from starlette.websockets import WebSocket
+
+from app.domain.values.identifiers import MatchID
+from app.web.ws.ws_manager import ConnectionManager
+from app.web.ws.ws_publisher import FastAPIWebSocketPublisher
+
+SUBSCRIBERS = 5_000
+BROADCASTS = 20
+
+
+def make_payload(match_id: uuid.UUID, i: int) -> dict:
+    return {
+        "type": "match_state",
+        "match_state": {
+            "match_id": str(match_id),
+            "team_a_name": "Зенит-Казань",
+            "team_b_name": "Динамо Москва",
+            "status": "LIVE",
+            "current_set": 3,
+            "score_a": 20 + i % 5,
+            "score_b": 18 + i % 7,
+            "sets_won_a": 1,
+            "sets_won_b": 1,
+            "rotation_a": [7, 3, 11, 5, 9, 1],
+            "rotation_b": [2, 14, 6, 8, 10, 4],
+            "serving_team": 1,
+            "set_scores": [[25, 21], [23, 25]],
+            "events_count": 120 + i,
+        },
+    }
+
+
+def make_socket(sent: list[int]) -> WebSocket:
+    async def receive():
+        return {"type": "websocket.connect"}
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            sent[0] += 1
+
+    scope = {"type": "websocket", "path": "/ws", "headers": []}
+    return WebSocket(scope, receive, send)
+
+
+async def drain(sent: list[int], expected: int) -> None:
+    while sent[0] < expected:
+        await asyncio.sleep(0)
+
+
+async def delivered(sent: list[int], expected: int) -> None:
+    # Если публикация не нашла подписчиков, падаем, а не ждём вечно
+    try:
+        await asyncio.wait_for(drain(sent, expected), timeout=30.0)
+    except TimeoutError:
+        raise RuntimeError(f"delivered {sent[0]} of {expected} messages") from None
+
+
+async def check_match_id_routing() -> None:
+    # Хендлеры публикуют по match.id (MatchID), а подписка идёт по UUID из
+    # пути: сообщение обязано дойти и до подписчиков матча, и до всех матчей
+    sent = [0]
+    match_id = MatchID.generate()
+    manager = ConnectionManager()
+    publisher = FastAPIWebSocketPublisher(manager)
+    await manager.connect(make_socket(sent), match_id.value)
+    await manager.connect_all_matches(make_socket(sent))
+    await publisher.publish(match_id, make_payload(match_id.value, 0))
+    await delivered(sent, 2)
+    await manager.stop()
+
+
+async def run_legacy(match_id: MatchID) -> tuple[float, float]:
+    # Прежняя схема: словарь в очереди, кодирование в каждом писателе
+    sent = [0]
+    sockets = [make_socket(sent) for _ in range(SUBSCRIBERS)]
+    for socket in sockets:
+        await socket.accept()
+    queues = [asyncio.Queue() for _ in sockets]
+
+    async def writer(socket: WebSocket, queue: asyncio.Queue):
+        while True:
+            await socket.send_json(await queue.get())
+
+    tasks = [asyncio.create_task(writer(s, q)) for s, q in zip(sockets, queues)]
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    enqueue = 0.0
+    for i in range(BROADCASTS):
+        data = make_payload(match_id.value, i)
+        t = time.perf_counter()
+        for queue in queues:
+            queue.put_nowait(data)
+        enqueue += time.perf_counter() - t
+        await delivered(sent, SUBSCRIBERS * (i + 1))
+    total = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return enqueue, total
+
+
+async def run_encode_once(match_id: MatchID) -> tuple[float, float]:
+    sent = [0]
+    manager = ConnectionManager(max_pending=BROADCASTS + 1)
+    publisher = FastAPIWebSocketPublisher(manager)
+    for _ in range(SUBSCRIBERS):
+        await manager.connect(make_socket(sent), match_id.value)
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    enqueue = 0.0
+    for i in range(BROADCASTS):
+        data = make_payload(match_id.value, i)
+        t = time.perf_counter()
+        await publisher.publish(match_id, data)
+        enqueue += time.perf_counter() - t
+        await delivered(sent, SUBSCRIBERS * (i + 1))
+    total = time.perf_counter() - started
+    await manager.stop()
+    return enqueue, total
+
+
+async def main() -> None:
+    await check_match_id_routing()
+    match_id = MatchID.generate()
+    print(f"{SUBSCRIBERS} subscribers, {BROADCASTS} broadcasts")
+    for name, run in (("send_json", run_legacy), ("encode once", run_encode_once)):
+        enqueue, total = await run(match_id)
+        print(
+            f"{name:>12}: broadcast {enqueue / BROADCASTS * 1000:.2f} ms, "
+            f"delivered {total / BROADCASTS * 1000:.2f} ms per message"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
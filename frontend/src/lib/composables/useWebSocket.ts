@@ -31,6 +31,8 @@ export type WSMessage = {
     score_b: number
     rotation_a?: number
     rotation_b?: number
+    sets_won_a?: number
+    sets_won_b?: number
     changes?: string[]
   }
 }
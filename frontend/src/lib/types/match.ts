@@ -21,6 +21,8 @@ export interface MatchState {
   score_b: number
   rotation_a: number
   rotation_b: number
+  sets_won_a: number
+  sets_won_b: number
   changes: string[]
 }
 
@@ -2,27 +2,120 @@ CREATE DATABASE IF NOT EXISTS volleyball;
 
 USE volleyball;
 
-CREATE TABLE IF NOT EXISTS domain_events (
-    event_id UUID,
-    event_type String,
-    match_id UUID,
-    payload String,
-    occurred_at DateTime64(3),
-    processed_at DateTime64(3) DEFAULT now()
-) ENGINE = MergeTree()
-ORDER BY (occurred_at, event_type);
-
 CREATE TABLE IF NOT EXISTS match_events_log (
+    event_id UUID,
+    event_type LowCardinality(String),
     match_id UUID,
-    player_number UInt8,
-    team_id UInt8,
-    action_type String,
-    result String,
+    seq UInt32,
     set_number UInt8,
+    team_id UInt8,
+    player_number UInt8,
+    action_type LowCardinality(String),
+    result LowCardinality(String),
     score_a UInt8,
     score_b UInt8,
     rotation_a UInt8,
     rotation_b UInt8,
+    winner UInt8,
+    team_a String,
+    team_b String,
     timestamp DateTime64(3)
-) ENGINE = MergeTree()
-ORDER BY (match_id, timestamp);
\ No newline at end of file
+) ENGINE = ReplacingMergeTree()
+ORDER BY (match_id, event_type, event_id);
+
+-- Названия команд из MatchStarted
+CREATE TABLE IF NOT EXISTS match_teams (
+    match_id UUID,
+    team_a String,
+    team_b String,
+    started_at DateTime64(3)
+) ENGINE = ReplacingMergeTree()
+ORDER BY match_id;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS match_teams_mv TO match_teams AS
+SELECT match_id, team_a, team_b, timestamp AS started_at
+FROM match_events_log
+WHERE event_type = 'MatchStarted';
+
+-- Материализованные представления срабатывают на каждую вставку, в том
+-- числе повторную, поэтому счётчики - это uniqExact по event_id, а не count:
+-- дубль события при переигрывании топика не меняет итог.
+
+-- Итоги матча: строки с одним match_id схлопываются при слияниях,
+-- в запросах всё равно агрегируем через GROUP BY
+CREATE TABLE IF NOT EXISTS match_summary (
+    match_id UUID,
+    rallies AggregateFunction(uniqExact, UUID),
+    points_a AggregateFunction(uniqExact, UUID),
+    points_b AggregateFunction(uniqExact, UUID),
+    sets_a AggregateFunction(uniqExact, UUID),
+    sets_b AggregateFunction(uniqExact, UUID),
+    winner SimpleAggregateFunction(max, UInt8),
+    first_event_at SimpleAggregateFunction(min, DateTime64(3)),
+    last_event_at SimpleAggregateFunction(max, DateTime64(3))
+) ENGINE = AggregatingMergeTree()
+ORDER BY match_id;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS match_summary_mv TO match_summary AS
+SELECT
+    match_id,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded') AS rallies,
+    uniqExactIfState(event_id, event_type = 'PointScored' AND team_id = 1) AS points_a,
+    uniqExactIfState(event_id, event_type = 'PointScored' AND team_id = 2) AS points_b,
+    uniqExactIfState(event_id, event_type = 'SetCompleted' AND match_events_log.winner = 1) AS sets_a,
+    uniqExactIfState(event_id, event_type = 'SetCompleted' AND match_events_log.winner = 2) AS sets_b,
+    maxIf(match_events_log.winner, event_type = 'MatchCompleted') AS winner,
+    min(timestamp) AS first_event_at,
+    max(timestamp) AS last_event_at
+FROM match_events_log
+GROUP BY match_id;
+
+-- Статистика команды в матче
+CREATE TABLE IF NOT EXISTS team_match_stats (
+    match_id UUID,
+    team_id UInt8,
+    rallies AggregateFunction(uniqExact, UUID),
+    scored AggregateFunction(uniqExact, UUID),
+    errors AggregateFunction(uniqExact, UUID),
+    points_won AggregateFunction(uniqExact, UUID),
+    sets_won AggregateFunction(uniqExact, UUID),
+    won AggregateFunction(uniqExact, UUID)
+) ENGINE = AggregatingMergeTree()
+ORDER BY (match_id, team_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS team_match_stats_mv TO team_match_stats AS
+SELECT
+    match_id,
+    if(event_type IN ('SetCompleted', 'MatchCompleted'), winner, team_id) AS team_id,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded') AS rallies,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded' AND result = 'SCORED') AS scored,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded' AND result = 'ERROR') AS errors,
+    uniqExactIfState(event_id, event_type = 'PointScored') AS points_won,
+    uniqExactIfState(event_id, event_type = 'SetCompleted') AS sets_won,
+    uniqExactIfState(event_id, event_type = 'MatchCompleted') AS won
+FROM match_events_log
+WHERE event_type IN ('RallyRecorded', 'PointScored', 'SetCompleted', 'MatchCompleted')
+GROUP BY match_id, team_id;
+
+-- Действия игроков по типу и результату
+CREATE TABLE IF NOT EXISTS player_action_stats (
+    match_id UUID,
+    team_id UInt8,
+    player_number UInt8,
+    action_type LowCardinality(String),
+    result LowCardinality(String),
+    events AggregateFunction(uniqExact, UUID)
+) ENGINE = AggregatingMergeTree()
+ORDER BY (match_id, team_id, player_number, action_type, result);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_action_stats_mv TO player_action_stats AS
+SELECT
+    match_id,
+    team_id,
+    player_number,
+    action_type,
+    result,
+    uniqExactState(event_id) AS events
+FROM match_events_log
+WHERE event_type = 'RallyRecorded'
+GROUP BY match_id, team_id, player_number, action_type, result;
@@ -0,0 +1,5 @@
+-- Таблицу domain_events никто не заполнял: события пишутся в match_events_log.
+--   docker compose exec -T clickhouse clickhouse-client --multiquery \
+--       < infrastructure/clickhouse/migrations/001_drop_domain_events.sql
+
+DROP TABLE IF EXISTS volleyball.domain_events;
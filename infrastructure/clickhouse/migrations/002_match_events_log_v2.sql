@@ -0,0 +1,217 @@
+-- match_events_log до типизированных событий был MergeTree без event_id и
+-- event_type: CREATE TABLE IF NOT EXISTS в init.sql его не меняет, вставки
+-- consumer падают, а дедупликации по event_id нет. Миграция создаёт новую
+-- таблицу, переносит в неё старые строки, меняет таблицы местами и заново
+-- строит материализованные представления отчётов.
+--
+-- Применять один раз, на таблице старой схемы, при остановленном consumer:
+--   docker compose stop kafka-consumer
+--   docker compose exec -T clickhouse clickhouse-client --multiquery \
+--       < infrastructure/clickhouse/migrations/002_match_events_log_v2.sql
+--   docker compose start kafka-consumer
+--
+-- Старые строки - это розыгрыши (RallyRecorded) без seq; event_id для них
+-- считается из содержимого строки. Если после миграции историю переигрывает
+-- backfill (python -m app.interfaces.backfill --sink clickhouse), сначала
+-- очистите match_events_log и таблицы отчётов (TRUNCATE): у backfill свои
+-- event_id, и перенесённые строки посчитались бы дважды.
+
+USE volleyball;
+
+-- Представления не должны срабатывать на перенос: их агрегаты строятся ниже
+
+DROP VIEW IF EXISTS match_teams_mv;
+DROP VIEW IF EXISTS match_summary_mv;
+DROP VIEW IF EXISTS team_match_stats_mv;
+DROP VIEW IF EXISTS player_action_stats_mv;
+
+CREATE TABLE match_events_log_v2 (
+    event_id UUID,
+    event_type LowCardinality(String),
+    match_id UUID,
+    seq UInt32,
+    set_number UInt8,
+    team_id UInt8,
+    player_number UInt8,
+    action_type LowCardinality(String),
+    result LowCardinality(String),
+    score_a UInt8,
+    score_b UInt8,
+    rotation_a UInt8,
+    rotation_b UInt8,
+    winner UInt8,
+    team_a String,
+    team_b String,
+    timestamp DateTime64(3)
+) ENGINE = ReplacingMergeTree()
+ORDER BY (match_id, event_type, event_id);
+
+INSERT INTO match_events_log_v2 (
+    event_id, event_type, match_id, set_number, team_id, player_number,
+    action_type, result, score_a, score_b, rotation_a, rotation_b, timestamp
+)
+SELECT
+    reinterpretAsUUID(MD5(concat(
+        toString(match_id), toString(timestamp), toString(team_id),
+        toString(player_number), action_type, result,
+        toString(score_a), toString(score_b)
+    ))),
+    'RallyRecorded',
+    match_id,
+    set_number,
+    team_id,
+    player_number,
+    action_type,
+    result,
+    score_a,
+    score_b,
+    rotation_a,
+    rotation_b,
+    timestamp
+FROM match_events_log;
+
+RENAME TABLE
+    match_events_log TO match_events_log_legacy,
+    match_events_log_v2 TO match_events_log;
+
+-- Агрегаты отчётов заново по перенесённым строкам
+CREATE TABLE IF NOT EXISTS match_teams (
+    match_id UUID,
+    team_a String,
+    team_b String,
+    started_at DateTime64(3)
+) ENGINE = ReplacingMergeTree()
+ORDER BY match_id;
+TRUNCATE TABLE match_teams;
+
+CREATE TABLE IF NOT EXISTS match_summary (
+    match_id UUID,
+    rallies AggregateFunction(uniqExact, UUID),
+    points_a AggregateFunction(uniqExact, UUID),
+    points_b AggregateFunction(uniqExact, UUID),
+    sets_a AggregateFunction(uniqExact, UUID),
+    sets_b AggregateFunction(uniqExact, UUID),
+    winner SimpleAggregateFunction(max, UInt8),
+    first_event_at SimpleAggregateFunction(min, DateTime64(3)),
+    last_event_at SimpleAggregateFunction(max, DateTime64(3))
+) ENGINE = AggregatingMergeTree()
+ORDER BY match_id;
+TRUNCATE TABLE match_summary;
+
+CREATE TABLE IF NOT EXISTS team_match_stats (
+    match_id UUID,
+    team_id UInt8,
+    rallies AggregateFunction(uniqExact, UUID),
+    scored AggregateFunction(uniqExact, UUID),
+    errors AggregateFunction(uniqExact, UUID),
+    points_won AggregateFunction(uniqExact, UUID),
+    sets_won AggregateFunction(uniqExact, UUID),
+    won AggregateFunction(uniqExact, UUID)
+) ENGINE = AggregatingMergeTree()
+ORDER BY (match_id, team_id);
+TRUNCATE TABLE team_match_stats;
+
+CREATE TABLE IF NOT EXISTS player_action_stats (
+    match_id UUID,
+    team_id UInt8,
+    player_number UInt8,
+    action_type LowCardinality(String),
+    result LowCardinality(String),
+    events AggregateFunction(uniqExact, UUID)
+) ENGINE = AggregatingMergeTree()
+ORDER BY (match_id, team_id, player_number, action_type, result);
+TRUNCATE TABLE player_action_stats;
+
+INSERT INTO match_teams
+SELECT match_id, team_a, team_b, timestamp AS started_at
+FROM match_events_log
+WHERE event_type = 'MatchStarted';
+
+INSERT INTO match_summary
+SELECT
+    match_id,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded') AS rallies,
+    uniqExactIfState(event_id, event_type = 'PointScored' AND team_id = 1) AS points_a,
+    uniqExactIfState(event_id, event_type = 'PointScored' AND team_id = 2) AS points_b,
+    uniqExactIfState(event_id, event_type = 'SetCompleted' AND match_events_log.winner = 1) AS sets_a,
+    uniqExactIfState(event_id, event_type = 'SetCompleted' AND match_events_log.winner = 2) AS sets_b,
+    maxIf(match_events_log.winner, event_type = 'MatchCompleted') AS winner,
+    min(timestamp) AS first_event_at,
+    max(timestamp) AS last_event_at
+FROM match_events_log
+GROUP BY match_id;
+
+INSERT INTO team_match_stats
+SELECT
+    match_id,
+    if(event_type IN ('SetCompleted', 'MatchCompleted'), winner, team_id) AS team_id,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded') AS rallies,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded' AND result = 'SCORED') AS scored,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded' AND result = 'ERROR') AS errors,
+    uniqExactIfState(event_id, event_type = 'PointScored') AS points_won,
+    uniqExactIfState(event_id, event_type = 'SetCompleted') AS sets_won,
+    uniqExactIfState(event_id, event_type = 'MatchCompleted') AS won
+FROM match_events_log
+WHERE event_type IN ('RallyRecorded', 'PointScored', 'SetCompleted', 'MatchCompleted')
+GROUP BY match_id, team_id;
+
+INSERT INTO player_action_stats
+SELECT
+    match_id,
+    team_id,
+    player_number,
+    action_type,
+    result,
+    uniqExactState(event_id) AS events
+FROM match_events_log
+WHERE event_type = 'RallyRecorded'
+GROUP BY match_id, team_id, player_number, action_type, result;
+
+-- Дальше агрегаты обновляются при каждой вставке
+CREATE MATERIALIZED VIEW IF NOT EXISTS match_teams_mv TO match_teams AS
+SELECT match_id, team_a, team_b, timestamp AS started_at
+FROM match_events_log
+WHERE event_type = 'MatchStarted';
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS match_summary_mv TO match_summary AS
+SELECT
+    match_id,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded') AS rallies,
+    uniqExactIfState(event_id, event_type = 'PointScored' AND team_id = 1) AS points_a,
+    uniqExactIfState(event_id, event_type = 'PointScored' AND team_id = 2) AS points_b,
+    uniqExactIfState(event_id, event_type = 'SetCompleted' AND match_events_log.winner = 1) AS sets_a,
+    uniqExactIfState(event_id, event_type = 'SetCompleted' AND match_events_log.winner = 2) AS sets_b,
+    maxIf(match_events_log.winner, event_type = 'MatchCompleted') AS winner,
+    min(timestamp) AS first_event_at,
+    max(timestamp) AS last_event_at
+FROM match_events_log
+GROUP BY match_id;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS team_match_stats_mv TO team_match_stats AS
+SELECT
+    match_id,
+    if(event_type IN ('SetCompleted', 'MatchCompleted'), winner, team_id) AS team_id,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded') AS rallies,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded' AND result = 'SCORED') AS scored,
+    uniqExactIfState(event_id, event_type = 'RallyRecorded' AND result = 'ERROR') AS errors,
+    uniqExactIfState(event_id, event_type = 'PointScored') AS points_won,
+    uniqExactIfState(event_id, event_type = 'SetCompleted') AS sets_won,
+    uniqExactIfState(event_id, event_type = 'MatchCompleted') AS won
+FROM match_events_log
+WHERE event_type IN ('RallyRecorded', 'PointScored', 'SetCompleted', 'MatchCompleted')
+GROUP BY match_id, team_id;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_action_stats_mv TO player_action_stats AS
+SELECT
+    match_id,
+    team_id,
+    player_number,
+    action_type,
+    result,
+    uniqExactState(event_id) AS events
+FROM match_events_log
+WHERE event_type = 'RallyRecorded'
+GROUP BY match_id, team_id, player_number, action_type, result;
+
+-- Старая таблица остаётся до проверки отчётов:
+--   DROP TABLE volleyball.match_events_log_legacy;
@@ -1,13 +1,20 @@
+import argparse
 import asyncio
 import json
 import logging
+import time
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from datetime import datetime
-
-from aiokafka import AIOKafkaConsumer
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, TopicPartition
+from aiokafka.structs import OffsetAndMetadata
 from asynch import Connection
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.infrastructure.repositories.clickhouse_client import ClickHouseClient
+from app.infrastructure.repositories.clickhouse_events import (
+    INSERT_MATCH_EVENTS,
+    MAPPERS,
+    map_message,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +28,14 @@ class ConsumerSettings(BaseSettings):
     CLICKHOUSE_USER: str = "default"
     CLICKHOUSE_PASSWORD: str = ""
 
+    CLICKHOUSE_BATCH_SIZE: int = 5000
+    CLICKHOUSE_FLUSH_INTERVAL: float = 1.0
+    CLICKHOUSE_RETRY_BACKOFF: float = 0.5
+    CLICKHOUSE_RETRY_BACKOFF_MAX: float = 30.0
+
+    CONSUMER_WORKERS: int = 1
+    CONSUMER_METRICS_PORT: int = 9108
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -30,11 +45,201 @@ class ConsumerSettings(BaseSettings):
 
 settings = ConsumerSettings()
 
+TOPICS = tuple(MAPPERS)
+
+
+class ClickHouseBatchWriter:
+    """Копит строки и пишет их в ClickHouse пачками.
+
+    flush() делает одну попытку: при ошибке строки остаются в буфере, а
+    следующая попытка назначается с экспоненциальной задержкой, не больше
+    backoff_max. Попытки не ограничены по числу, а ожидание не блокирует
+    цикл опроса Kafka. Офсеты Kafka коммитятся только после успешной вставки.
+    """
+
+    def __init__(
+        self,
+        client: ClickHouseClient,
+        query: str,
+        batch_size: int,
+        flush_interval: float,
+        backoff: float,
+        backoff_max: float,
+    ):
+        self._client = client
+        self._query = query
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._backoff = backoff
+        self._backoff_max = backoff_max
+        self._rows: list[tuple] = []
+        self._offsets: dict[TopicPartition, int] = {}
+        self._first_row_at: float | None = None
+        self._failures = 0
+        self._retry_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, tp: TopicPartition, offset: int, row: tuple | None) -> None:
+        # Битое сообщение не пишем, но его офсет всё равно коммитим
+        if row is not None:
+            if self._first_row_at is None:
+                self._first_row_at = time.monotonic()
+            self._rows.append(row)
+        self._offsets[tp] = offset + 1
+
+    @property
+    def backing_off(self) -> bool:
+        return self._retry_at is not None
+
+    def forget(self, partitions) -> None:
+        # Партиции ушли другому воркеру: их офсеты коммитит новый владелец
+        for tp in partitions:
+            self._offsets.pop(tp, None)
+
+    def should_flush(self) -> bool:
+        if self._retry_at is not None:
+            return time.monotonic() >= self._retry_at
+        if len(self._rows) >= self._batch_size:
+            return True
+        if self._first_row_at is None:
+            return bool(self._offsets)
+        return time.monotonic() - self._first_row_at >= self._flush_interval
+
+    async def _reconnect(self) -> None:
+        try:
+            await self._client.reconnect()
+        except Exception as e:
+            logger.warning(f"ClickHouse reconnect failed: {e}")
+
+    async def flush(self) -> dict[TopicPartition, OffsetAndMetadata] | None:
+        """Офсеты для коммита или None, если вставка не прошла."""
+        if self._rows:
+            try:
+                await self._client.insert_columnar(self._query, self._rows)
+            except Exception as e:
+                self._failures += 1
+                delay = min(
+                    self._backoff * 2 ** (self._failures - 1), self._backoff_max
+                )
+                self._retry_at = time.monotonic() + delay
+                logger.error(
+                    f"ClickHouse insert of {len(self._rows)} rows failed "
+                    f"(attempt {self._failures}): {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                await self._reconnect()
+                return None
+            logger.info(f"Inserted {len(self._rows)} rows into ClickHouse")
+        offsets, self._offsets = self._offsets, {}
+        self._rows = []
+        self._first_row_at = None
+        self._failures = 0
+        self._retry_at = None
+        return {tp: OffsetAndMetadata(offset, "") for tp, offset in offsets.items()}
+
+
+class PartitionLag:
+    """Отставание по партициям, которое воркеры обновляют после каждой выборки."""
 
-class KafkaToClickHouseConsumer:
     def __init__(self):
-        self.consumer = None
-        self.clickhouse = None
+        self._partitions: dict[TopicPartition, dict] = {}
+
+    def update(self, worker_id: int, tp: TopicPartition, position: int, highwater):
+        self._partitions[tp] = {
+            "topic": tp.topic,
+            "partition": tp.partition,
+            "worker": worker_id,
+            "position": position,
+            "highwater": highwater,
+            "lag": max(highwater - position, 0) if highwater is not None else None,
+        }
+
+    def forget(self, partitions) -> None:
+        for tp in partitions:
+            self._partitions.pop(tp, None)
+
+    def snapshot(self) -> dict:
+        partitions = sorted(
+            self._partitions.values(), key=lambda p: (p["topic"], p["partition"])
+        )
+        return {
+            "partitions": partitions,
+            "total_lag": sum(p["lag"] or 0 for p in partitions),
+        }
+
+    def prometheus(self) -> str:
+        lines = [
+            "# HELP kafka_consumer_lag Messages behind the partition highwater",
+            "# TYPE kafka_consumer_lag gauge",
+        ]
+        for p in self.snapshot()["partitions"]:
+            if p["lag"] is None:
+                continue
+            lines.append(
+                f'kafka_consumer_lag{{topic="{p["topic"]}",'
+                f'partition="{p["partition"]}",worker="{p["worker"]}"}} {p["lag"]}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+class LagServer:
+    """Минимальный HTTP: GET /lag отдаёт JSON, GET /metrics - Prometheus."""
+
+    def __init__(self, lag: PartitionLag, port: int):
+        self._lag = lag
+        self._port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "0.0.0.0", self._port)
+        logger.info(f"Lag metrics on :{self._port}/lag and /metrics")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else "/"
+            if path == "/metrics":
+                status, content_type = "200 OK", "text/plain; version=0.0.4"
+                body = self._lag.prometheus().encode()
+            elif path == "/lag":
+                status, content_type = "200 OK", "application/json"
+                body = json.dumps(self._lag.snapshot()).encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b""
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+class PartitionWorker(ConsumerRebalanceListener):
+    """Участник группы clickhouse-writer со своими партициями и соединением.
+
+    Перед отдачей партиций при ребалансе дописывает буфер и коммитит
+    офсеты, чтобы новый владелец начал ровно с того же места.
+    """
+
+    def __init__(self, worker_id: int, lag: PartitionLag):
+        self.worker_id = worker_id
+        self.consumer: AIOKafkaConsumer | None = None
+        self.clickhouse_conn: Connection | None = None
+        self.writer: ClickHouseBatchWriter | None = None
+        self._lag = lag
+        self._flush_lock = asyncio.Lock()
 
     async def start(self):
         self.clickhouse_conn = Connection(
@@ -45,65 +250,155 @@ class KafkaToClickHouseConsumer:
             password=settings.CLICKHOUSE_PASSWORD,
         )
         await self.clickhouse_conn.connect()
-        logger.info("Connected to ClickHouse")
+        self.writer = ClickHouseBatchWriter(
+            ClickHouseClient(self.clickhouse_conn),
+            INSERT_MATCH_EVENTS,
+            batch_size=settings.CLICKHOUSE_BATCH_SIZE,
+            flush_interval=settings.CLICKHOUSE_FLUSH_INTERVAL,
+            backoff=settings.CLICKHOUSE_RETRY_BACKOFF,
+            backoff_max=settings.CLICKHOUSE_RETRY_BACKOFF_MAX,
+        )
         self.consumer = AIOKafkaConsumer(
-            "match-started",
-            "point-scored",
-            "set-completed",
-            "match-completed",
             bootstrap_servers=settings.KAFKA_URL,
-            value_deserializer=lambda m: json.loads(m.decode("utf-8")),
             group_id="clickhouse-writer",
+            client_id=f"clickhouse-writer-{self.worker_id}",
             auto_offset_reset="earliest",
+            enable_auto_commit=False,
+            max_poll_records=settings.CLICKHOUSE_BATCH_SIZE,
         )
+        self.consumer.subscribe(TOPICS, listener=self)
         await self.consumer.start()
-        logger.info("Connected to Kafka")
+        logger.info(f"Worker {self.worker_id} connected")
+
+    async def on_partitions_revoked(self, revoked):
+        if revoked:
+            await self._flush()
+            self.writer.forget(revoked)
+            self._lag.forget(revoked)
+            logger.info(f"Worker {self.worker_id} revoked: {sorted(revoked)}")
+
+    async def on_partitions_assigned(self, assigned):
+        if assigned and self.writer.backing_off:
+            self.consumer.pause(*assigned)
+        logger.info(f"Worker {self.worker_id} assigned: {sorted(assigned)}")
 
     async def run(self):
         await self.start()
         try:
-            async for msg in self.consumer:
-                await self._process_event(msg)
-        except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            while True:
+                try:
+                    await self._poll()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # Воркер не падает: ошибка одной итерации не должна
+                    # останавливать чтение партиций
+                    logger.exception(f"Worker {self.worker_id} poll failed")
+                    await asyncio.sleep(settings.CLICKHOUSE_RETRY_BACKOFF)
+        except asyncio.CancelledError:
+            pass
         finally:
             await self.stop()
 
-    async def _process_event(self, msg):
-        event_type = msg.topic
-        data = msg.value
-        occurred_at = data.get("occurred_at", datetime.now().isoformat())
-        logger.info(f"Processing event: {event_type}, match: {data.get('match_id')}")
-        query = """
-            INSERT INTO domain_events 
-            (event_id, event_type, match_id, payload, occurred_at)
-            VALUES (generateUUIDv4(), %(event_type)s, %(match_id)s, %(payload)s, %(occurred_at)s)
-        """
-        await self.clickhouse_conn.execute(
-            query,
-            {
-                "event_type": event_type,
-                "match_id": data.get("match_id"),
-                "payload": json.dumps(data),
-                "occurred_at": datetime.fromisoformat(
-                    occurred_at.replace("Z", "+00:00")
-                ),
-            },
+    async def _poll(self):
+        batches = await self.consumer.getmany(
+            timeout_ms=int(settings.CLICKHOUSE_FLUSH_INTERVAL * 1000),
+            max_records=settings.CLICKHOUSE_BATCH_SIZE,
         )
-        # if event_type == "point-scored":
-        #     await self._log_point_scored(data)
+        for tp, messages in batches.items():
+            for msg in messages:
+                self.writer.add(tp, msg.offset, self._to_row(msg))
+        if self.writer.should_flush():
+            await self._flush()
+        await self._update_lag()
+
+    def _to_row(self, msg) -> tuple | None:
+        try:
+            return map_message(msg.topic, msg.value)
+        except Exception as e:
+            logger.error(
+                f"Skipping malformed message {msg.topic}:{msg.partition}"
+                f"@{msg.offset}: {e}"
+            )
+            return None
 
-    # async def _log_point_scored(self, data):
-    #     pass
+    async def _update_lag(self):
+        for tp in self.consumer.assignment():
+            try:
+                position = await self.consumer.position(tp)
+            except Exception:
+                continue
+            self._lag.update(self.worker_id, tp, position, self.consumer.highwater(tp))
+
+    async def _flush(self):
+        async with self._flush_lock:
+            offsets = await self.writer.flush()
+            if offsets is None:
+                # ClickHouse недоступен: партиции на паузе, а getmany
+                # продолжает вызываться, поэтому группа не считает воркер
+                # зависшим и не устраивает ребаланс
+                self.consumer.pause(*self.consumer.assignment())
+                return
+            if self.consumer.paused():
+                self.consumer.resume(*self.consumer.paused())
+            if not offsets:
+                return
+            try:
+                await self.consumer.commit(offsets)
+            except Exception as e:
+                # Строки уже в ClickHouse: после ребаланса часть пачки придёт снова
+                logger.warning(f"Worker {self.worker_id} offset commit failed: {e}")
 
     async def stop(self):
         if self.consumer:
+            if self.writer and len(self.writer):
+                try:
+                    await asyncio.wait_for(
+                        self._flush(), timeout=settings.CLICKHOUSE_RETRY_BACKOFF_MAX
+                    )
+                except Exception as e:
+                    logger.error(f"Worker {self.worker_id} final flush failed: {e}")
             await self.consumer.stop()
-        if self.clickhouse:
+        if self.clickhouse_conn:
             await self.clickhouse_conn.close()
-        logger.info("Consumer stopped")
+        logger.info(f"Worker {self.worker_id} stopped")
+
+
+class KafkaToClickHouseConsumer:
+    def __init__(self, workers: int = 1, metrics_port: int | None = None):
+        self.lag = PartitionLag()
+        self.workers = [PartitionWorker(i, self.lag) for i in range(workers)]
+        self._lag_server = LagServer(self.lag, metrics_port) if metrics_port else None
+
+    async def run(self):
+        if self._lag_server is not None:
+            await self._lag_server.start()
+        logger.info(f"Starting {len(self.workers)} partition workers")
+        try:
+            await asyncio.gather(*(worker.run() for worker in self.workers))
+        finally:
+            if self._lag_server is not None:
+                await self._lag_server.stop()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Kafka -> ClickHouse consumer")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.CONSUMER_WORKERS,
+        help="partition workers in the consumer group",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.CONSUMER_METRICS_PORT,
+        help="port for /lag and /metrics, 0 to disable",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    consumer = KafkaToClickHouseConsumer()
+    args = parse_args()
+    consumer = KafkaToClickHouseConsumer(args.workers, args.metrics_port)
     asyncio.run(consumer.run())
@@ -8,12 +8,14 @@ CREATE TABLE IF NOT EXISTS matches (
     composition_a INTEGER[], 
     composition_b INTEGER[],
     status VARCHAR(20),
+    winner SMALLINT,
     current_set SMALLINT,
     score_a SMALLINT, 
     score_b SMALLINT, 
     set_scores JSONB,
     rotation_a SMALLINT,
     rotation_b SMALLINT,
+    events_count INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -25,6 +27,7 @@ CREATE INDEX IF NOT EXISTS idx_matches_chat_status ON matches(chat_id, status);
 CREATE TABLE IF NOT EXISTS match_events (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     match_id UUID REFERENCES matches(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
     player_number INTEGER NOT NULL,
     team_id INTEGER NOT NULL CHECK (team_id IN (1, 2)),
     action_type VARCHAR(50) NOT NULL,
@@ -37,6 +40,62 @@ CREATE TABLE IF NOT EXISTS match_events (
     timestamp TIMESTAMPTZ DEFAULT NOW()
 );
 
-CREATE INDEX IF NOT EXISTS idx_match_events_match_id ON match_events(match_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_match_events_match_seq ON match_events(match_id, seq);
 CREATE INDEX IF NOT EXISTS idx_match_events_timestamp ON match_events(timestamp);
-CREATE INDEX IF NOT EXISTS idx_match_events_match_set ON match_events(match_id, set_number);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_match_events_match_set ON match_events(match_id, set_number);
+
+CREATE TABLE IF NOT EXISTS match_events_dead_letter (
+    id BIGSERIAL PRIMARY KEY,
+    match_id UUID,
+    seq INTEGER,
+    row JSONB NOT NULL,
+    error TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_match_events_dead_letter_match ON match_events_dead_letter(match_id);
+
+CREATE TABLE IF NOT EXISTS match_snapshots (
+    match_id UUID REFERENCES matches(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    status VARCHAR(20),
+    current_set SMALLINT,
+    score_a SMALLINT,
+    score_b SMALLINT,
+    set_scores JSONB,
+    rotation_a SMALLINT,
+    rotation_b SMALLINT,
+    events_count INTEGER NOT NULL,
+    updated_at TIMESTAMPTZ,
+    PRIMARY KEY (match_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL PRIMARY KEY,
+    aggregate_id UUID NOT NULL,
+    topic VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION notify_outbox() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('outbox', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS outbox_notify ON outbox;
+CREATE TRIGGER outbox_notify
+    AFTER INSERT ON outbox
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox();
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(255) PRIMARY KEY,
+    action VARCHAR(50) NOT NULL,
+    -- NULL, пока команда не записала ответ: ключ резервируется в её транзакции
+    response JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys(created_at);
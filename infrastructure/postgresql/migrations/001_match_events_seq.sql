@@ -0,0 +1,44 @@
+-- Обновление базы, созданной до нумерации событий матча.
+-- init.sql выполняется только на пустом томе, поэтому существующим
+-- инсталляциям нужно применить этот файл вручную (он идемпотентен):
+--   docker compose exec -T postgres psql -U postgres -d volleyball \
+--       < infrastructure/postgresql/migrations/001_match_events_seq.sql
+
+BEGIN;
+
+ALTER TABLE matches ADD COLUMN IF NOT EXISTS events_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE match_events ADD COLUMN IF NOT EXISTS seq INTEGER;
+
+-- Старые события нумеруются в порядке записи
+UPDATE match_events AS e
+SET seq = numbered.seq
+FROM (
+    SELECT id, ROW_NUMBER() OVER (PARTITION BY match_id ORDER BY timestamp, id) AS seq
+    FROM match_events
+) AS numbered
+WHERE e.id = numbered.id AND e.seq IS NULL;
+
+ALTER TABLE match_events ALTER COLUMN seq SET NOT NULL;
+
+UPDATE matches AS m
+SET events_count = counted.events_count
+FROM (
+    SELECT match_id, MAX(seq) AS events_count FROM match_events GROUP BY match_id
+) AS counted
+WHERE m.id = counted.match_id AND m.events_count < counted.events_count;
+
+DROP INDEX IF EXISTS idx_match_events_match_id;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_match_events_match_seq ON match_events(match_id, seq);
+
+CREATE TABLE IF NOT EXISTS match_events_dead_letter (
+    id BIGSERIAL PRIMARY KEY,
+    match_id UUID,
+    seq INTEGER,
+    row JSONB NOT NULL,
+    error TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_match_events_dead_letter_match ON match_events_dead_letter(match_id);
+
+COMMIT;
@@ -0,0 +1,19 @@
+-- Ключ идемпотентности резервируется в транзакции команды до её выполнения,
+-- ответ дописывается позже, поэтому response становится необязательным.
+--   docker compose exec -T postgres psql -U postgres -d volleyball \
+--       < infrastructure/postgresql/migrations/002_idempotency_reservations.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(255) PRIMARY KEY,
+    action VARCHAR(50) NOT NULL,
+    response JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE idempotency_keys ALTER COLUMN response DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys(created_at);
+
+COMMIT;
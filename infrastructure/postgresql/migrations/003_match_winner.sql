@@ -0,0 +1,26 @@
+-- Победитель матча сохраняется при завершении: при ручном завершении он
+-- может не совпадать со счётом по партиям (в том числе при ничьей).
+--   docker compose exec -T postgres psql -U postgres -d volleyball \
+--       < infrastructure/postgresql/migrations/003_match_winner.sql
+
+BEGIN;
+
+ALTER TABLE matches ADD COLUMN IF NOT EXISTS winner SMALLINT;
+
+-- Для уже завершённых матчей победитель восстанавливается по партиям,
+-- при ничьей остаётся NULL
+UPDATE matches AS m
+SET winner = CASE WHEN sets.won_a > sets.won_b THEN 1 ELSE 2 END
+FROM (
+    SELECT id,
+        COUNT(*) FILTER (WHERE (s ->> 0)::int > (s ->> 1)::int) AS won_a,
+        COUNT(*) FILTER (WHERE (s ->> 0)::int < (s ->> 1)::int) AS won_b
+    FROM matches, jsonb_array_elements(set_scores) AS s
+    GROUP BY id
+) AS sets
+WHERE m.id = sets.id
+    AND m.status = 'COMPLETED'
+    AND m.winner IS NULL
+    AND sets.won_a <> sets.won_b;
+
+COMMIT;
@@ -0,0 +1,28 @@
+-- Транзакционный outbox: команды пишут события в ту же транзакцию,
+-- OutboxRelay вычитывает их по NOTIFY и публикует в Kafka.
+--   docker compose exec -T postgres psql -U postgres -d volleyball \
+--       < infrastructure/postgresql/migrations/004_outbox.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id BIGSERIAL PRIMARY KEY,
+    aggregate_id UUID NOT NULL,
+    topic VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION notify_outbox() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('outbox', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS outbox_notify ON outbox;
+CREATE TRIGGER outbox_notify
+    AFTER INSERT ON outbox
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox();
+
+COMMIT;
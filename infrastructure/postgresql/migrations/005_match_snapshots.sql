@@ -0,0 +1,23 @@
+-- Снимки состояния матча: чтение на момент at_seq начинается с ближайшего
+-- снимка и доигрывает хвост match_events.
+--   docker compose exec -T postgres psql -U postgres -d volleyball \
+--       < infrastructure/postgresql/migrations/005_match_snapshots.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS match_snapshots (
+    match_id UUID REFERENCES matches(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    status VARCHAR(20),
+    current_set SMALLINT,
+    score_a SMALLINT,
+    score_b SMALLINT,
+    set_scores JSONB,
+    rotation_a SMALLINT,
+    rotation_b SMALLINT,
+    events_count INTEGER NOT NULL,
+    updated_at TIMESTAMPTZ,
+    PRIMARY KEY (match_id, seq)
+);
+
+COMMIT;
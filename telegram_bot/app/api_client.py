@@ -4,7 +4,7 @@ from uuid import UUID
 import httpx
 
 from app.config import settings
-from app.infrastructure.api_adapter import RabbitMQAPIAdapter
+from app.infrastructure.api_adapter import DuplicateRequestError, RabbitMQAPIAdapter
 from app.infrastructure.client import RabbitMQClient
 
 
@@ -55,6 +55,19 @@ class APIClient:
         if self._rabbitmq_client:
             await self._rabbitmq_client.stop()
 
+    @staticmethod
+    def _raise_for_duplicate(response: httpx.Response) -> None:
+        if response.status_code == 409 and response.json().get("detail") == (
+            "duplicate_request"
+        ):
+            raise DuplicateRequestError("Request has already been applied")
+
+    @staticmethod
+    def _idempotency_headers(idempotency_key: str | None) -> dict[str, str]:
+        if idempotency_key is None:
+            return {}
+        return {"Idempotency-Key": idempotency_key}
+
     async def request_advice(self, match_id: UUID, chat_id: int) -> str:
         if self.use_rabbitmq:
             await self._init_rabbitmq()
@@ -94,11 +107,17 @@ class APIClient:
         composition_a: list[int],
         composition_b: list[int],
         chat_id: int,
+        idempotency_key: str | None = None,
     ) -> dict:
         if self.use_rabbitmq:
             await self._init_rabbitmq()
             return await self._rabbitmq_adapter.create_match(
-                team_a_name, team_b_name, composition_a, composition_b, chat_id
+                team_a_name,
+                team_b_name,
+                composition_a,
+                composition_b,
+                chat_id,
+                idempotency_key,
             )
 
         url = f"{self.base_url}/api/matches/"
@@ -126,11 +145,12 @@ class APIClient:
         action_type: str,
         result: str,
         timestamp: datetime | None = None,
+        idempotency_key: str | None = None,
     ) -> dict:
         if self.use_rabbitmq:
             await self._init_rabbitmq()
             return await self._rabbitmq_adapter.record_event(
-                match_id, player_number, team_id, action_type, result
+                match_id, player_number, team_id, action_type, result, idempotency_key
             )
 
         url = f"{self.base_url}/api/matches/{match_id}/events"
@@ -142,9 +162,12 @@ class APIClient:
             "timestamp": timestamp.isoformat() if timestamp else None,
         }
 
-        response = await self.session.post(url, json=body)
+        response = await self.session.post(
+            url, json=body, headers=self._idempotency_headers(idempotency_key)
+        )
         if response.status_code == 404:
             raise NotFoundError("Match not found")
+        self._raise_for_duplicate(response)
         if response.status_code == 409:
             raise ConflictError("Match not live")
         response.raise_for_status()
@@ -154,16 +177,22 @@ class APIClient:
         self,
         match_id: UUID,
         winner: int | None = None,
+        idempotency_key: str | None = None,
     ):
         if self.use_rabbitmq:
             await self._init_rabbitmq()
-            return await self._rabbitmq_adapter.complete_match(match_id, winner)
+            return await self._rabbitmq_adapter.complete_match(
+                match_id, winner, idempotency_key
+            )
 
         url = f"{self.base_url}/api/matches/{match_id}/complete"
         body = {
             "winner": winner,
         }
-        response = await self.session.post(url, json=body)
+        response = await self.session.post(
+            url, json=body, headers=self._idempotency_headers(idempotency_key)
+        )
+        self._raise_for_duplicate(response)
         response.raise_for_status()
         return response.json()
 
@@ -1,5 +1,5 @@
 import logging
-from uuid import UUID
+from uuid import UUID, uuid4
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
@@ -7,7 +7,7 @@ from aiogram.fsm.state import State, StatesGroup
 
 
 from app import deps
-from app.api_client import ConflictError, NotFoundError
+from app.api_client import ConflictError, DuplicateRequestError, NotFoundError
 from app.keyboards.actions import (
     get_action_keyboard,
     get_event_confirmation_keyboard,
@@ -108,7 +108,12 @@ async def process_player_selection(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     composition_a = data["composition_a"]
     team_id = 1 if player_number in composition_a else 2
-    await state.update_data(player_number=player_number, team_id=team_id)
+    # Один ключ на событие: повторное "да" не запишет его дважды
+    await state.update_data(
+        player_number=player_number,
+        team_id=team_id,
+        event_idempotency_key=str(uuid4()),
+    )
     report = (
         f"Действие: {data['action_type']}\n\n"
         f"Результат: {data['result']}\n\n"
@@ -155,6 +160,7 @@ async def process_event_confirmation(callback: CallbackQuery, state: FSMContext)
                 team_id,
                 action_type,
                 result,
+                idempotency_key=data.get("event_idempotency_key"),
             )
             score_a = response["score_a"]
             score_b = response["score_b"]
@@ -177,6 +183,12 @@ async def process_event_confirmation(callback: CallbackQuery, state: FSMContext)
             await callback.answer()
             await state.clear()
 
+        except DuplicateRequestError:
+            # Повторное "да": событие уже записано, продолжаем запись
+            await callback.message.edit_text("Событие уже записано")
+            await callback.answer()
+            await start_event_recording(callback, state, active_match_id)
+
         except ConflictError:
             await callback.message.edit_text("Матч уже завершён")
             await callback.answer()
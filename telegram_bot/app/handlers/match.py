@@ -1,4 +1,4 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
@@ -6,7 +6,12 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from app import deps
-from app.api_client import APIClient, ConflictError, ValidationError
+from app.api_client import (
+    APIClient,
+    ConflictError,
+    DuplicateRequestError,
+    ValidationError,
+)
 from app.keyboards.actions import get_complete_keyboard, get_confirmation_keyboard
 
 
@@ -92,7 +97,8 @@ async def process_composition_b(message: Message, state: FSMContext):
         if not 1 <= num <= 99:
             await message.answer("Номера должны быть от 1 до 99. Попробуйте ещё раз:")
             return
-    await state.update_data(composition_b=numbers)
+    # Один ключ на создание матча: повторное "да" не создаст второй матч
+    await state.update_data(composition_b=numbers, create_idempotency_key=str(uuid4()))
 
     data = await state.get_data()
     team_a_name = data.get("team_a_name")
@@ -138,6 +144,7 @@ async def process_match_confirmation(callback: CallbackQuery, state: FSMContext)
             composition_a=data["composition_a"],
             composition_b=data["composition_b"],
             chat_id=callback.message.chat.id,
+            idempotency_key=data.get("create_idempotency_key"),
         )
         match_id = result["id"]
         await callback.message.edit_text(
@@ -154,6 +161,11 @@ async def process_match_confirmation(callback: CallbackQuery, state: FSMContext)
         await callback.answer()
         await state.clear()
 
+    except DuplicateRequestError:
+        await callback.message.edit_text("Матч уже создан")
+        await callback.answer()
+        await state.clear()
+
     except ConflictError as e:
         await callback.message.edit_text(f"{e}")
         await callback.answer()
@@ -216,7 +228,9 @@ async def cmd_complete(message: Message, state: FSMContext):
             f"Текущий счёт: {match['score_a']}:{match['score_b']}",
             reply_markup=get_complete_keyboard(),
         )
-        await state.update_data(complete_match_id=match_id)
+        await state.update_data(
+            complete_match_id=match_id, complete_idempotency_key=str(uuid4())
+        )
     except Exception as e:
         await message.answer("Ошибка при получении данных")
 
@@ -241,11 +255,17 @@ async def process_complete_confirmation(callback: CallbackQuery, state: FSMConte
         return
 
     try:
-        result = await deps.api_client.complete_match(match_id=match_id)
+        result = await deps.api_client.complete_match(
+            match_id=match_id,
+            idempotency_key=data.get("complete_idempotency_key"),
+        )
         await callback.message.edit_text(
             f"Матч завершен!\n\nПобедитель: {result.get('winner')}"
         )
         await state.clear()
+    except DuplicateRequestError:
+        await callback.message.edit_text("Матч уже завершён")
+        await state.clear()
     except Exception as e:
         await callback.message.edit_text("Ошибка завершения матча")
     finally:
@@ -1,5 +1,5 @@
 from typing import Any, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 from app.infrastructure.client import RabbitMQClient
 from app.infrastructure.models import (
     AdviceResponse,
@@ -10,6 +10,16 @@ from app.infrastructure.models import (
 )
 
 
+class DuplicateRequestError(Exception):
+    """Команда с этим ключом идемпотентности уже применена."""
+
+
+def _check_duplicate(response: dict[str, Any]) -> dict[str, Any]:
+    if response.get("error") == "duplicate_request":
+        raise DuplicateRequestError("Request has already been applied")
+    return response
+
+
 class RabbitMQAPIAdapter:
     def __init__(self, client: RabbitMQClient):
         self._client = client
@@ -21,6 +31,7 @@ class RabbitMQAPIAdapter:
         composition_a: list[int],
         composition_b: list[int],
         chat_id: int,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any]:
         payload = {
             "team_a_name": team_a_name,
@@ -28,8 +39,11 @@ class RabbitMQAPIAdapter:
             "composition_a": composition_a,
             "composition_b": composition_b,
             "chat_id": chat_id,
+            "idempotency_key": idempotency_key or str(uuid4()),
         }
-        response = await self._client.publish_request("create_match", payload)
+        response = _check_duplicate(
+            await self._client.publish_request("create_match", payload)
+        )
         return response.get("match", {})
 
     async def request_advice(self, match_id: UUID, chat_id: int) -> str:
@@ -57,6 +71,7 @@ class RabbitMQAPIAdapter:
         team_id: int,
         action_type: str,
         result: str,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any]:
         payload = {
             "match_id": str(match_id),
@@ -64,15 +79,44 @@ class RabbitMQAPIAdapter:
             "team_id": team_id,
             "action_type": action_type,
             "result": result,
+            "idempotency_key": idempotency_key or str(uuid4()),
         }
-        response = await self._client.publish_request("record_event", payload)
+        response = _check_duplicate(
+            await self._client.publish_request("record_event", payload)
+        )
         return response.get("match_state", {})
 
+    async def record_events(
+        self,
+        match_id: UUID,
+        events: list[dict[str, Any]],
+        idempotency_key: str | None = None,
+    ) -> dict[str, Any]:
+        payload = {
+            "match_id": str(match_id),
+            "events": events,
+            "idempotency_key": idempotency_key or str(uuid4()),
+        }
+        response = _check_duplicate(
+            await self._client.publish_request("record_events", payload)
+        )
+        return {
+            "match_state": response.get("match_state") or {},
+            "results": response.get("results", []),
+        }
+
     async def complete_match(
         self,
         match_id: UUID,
         winner: Optional[int] = None,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any]:
-        payload = {"match_id": str(match_id), "winner": winner}
-        response = await self._client.publish_request("complete_match", payload)
+        payload = {
+            "match_id": str(match_id),
+            "winner": winner,
+            "idempotency_key": idempotency_key or str(uuid4()),
+        }
+        response = _check_duplicate(
+            await self._client.publish_request("complete_match", payload)
+        )
         return response.get("result", {})
@@ -1,18 +1,22 @@
 import asyncio
 import json
 import logging
-from typing import Any
+import time
 import uuid
+from collections import defaultdict, deque
+from datetime import UTC, datetime, timedelta
+from typing import Any
 
 import aio_pika
 
-from datetime import datetime, timezone
-
 from app.config import settings
 
-
 logger = logging.getLogger(__name__)
 
+# Действия, которые ждут LLM, уходят в отдельную очередь
+SLOW_ACTIONS = frozenset({"request_advice"})
+LATENCY_WINDOW = 1000
+
 
 class RabbitMQClient:
     def __init__(
@@ -26,7 +30,14 @@ class RabbitMQClient:
         self._channel = None
         self._started = False
         self._response_futures: dict[str, asyncio.Future] = {}
-        self._consumer_tags: dict[str, str] = {}
+        # Одна очередь ответов на процесс: имя задаём сами, чтобы robust
+        # соединение могло переобъявить её после переподключения
+        self._reply_queue_name = f"bot.replies.{uuid.uuid4().hex}"
+        self._reply_queue = None
+        self._reply_consumer_tag = None
+        self._latencies: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=LATENCY_WINDOW)
+        )
 
     async def start(self):
         if self._started:
@@ -41,6 +52,12 @@ class RabbitMQClient:
                 durable=True,
                 auto_delete=False,
             )
+            self._reply_queue = await self._channel.declare_queue(
+                self._reply_queue_name, exclusive=True, auto_delete=True
+            )
+            self._reply_consumer_tag = await self._reply_queue.consume(
+                self._on_response, no_ack=True
+            )
             self._started = True
             logger.info("RabbitMQ connected and queues declared")
         except Exception as e:
@@ -50,15 +67,55 @@ class RabbitMQClient:
     async def stop(self):
         if not self._started:
             return
+        if self._reply_queue and self._reply_consumer_tag:
+            await self._reply_queue.cancel(self._reply_consumer_tag)
         if self._channel:
             await self._channel.close()
         if self._connection:
             await self._connection.close()
         self._started = False
+        for future in self._response_futures.values():
+            if not future.done():
+                future.cancel()
         self._response_futures.clear()
-        self._consumer_tags.clear()
+        self._reply_queue = None
+        self._reply_consumer_tag = None
         logger.info("RabbitMQ disconnected")
 
+    async def _on_response(self, message: aio_pika.abc.AbstractIncomingMessage):
+        try:
+            data = json.loads(message.body.decode())
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to decode response: {e}")
+            return
+        correlation_id = message.correlation_id or data.get("correlation_id")
+        future = self._response_futures.get(correlation_id)
+        if future is None or future.done():
+            # Ответ пришёл после таймаута
+            logger.debug(f"Dropping late response {correlation_id}")
+            return
+        future.set_result(data)
+
+    @staticmethod
+    def _queue_for(action: str) -> str:
+        if action in SLOW_ACTIONS:
+            return settings.BOT_TO_BACKEND_SLOW_QUEUE
+        return settings.BOT_TO_BACKEND_QUEUE
+
+    def latency_stats(self) -> dict[str, dict[str, float]]:
+        stats = {}
+        for action, samples in self._latencies.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats[action] = {
+                "count": len(ordered),
+                "p50_ms": ordered[len(ordered) // 2],
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max_ms": ordered[-1],
+            }
+        return stats
+
     async def publish_request(
         self, action: str, payload: dict[str, Any]
     ) -> dict[str, Any]:
@@ -69,59 +126,42 @@ class RabbitMQClient:
             raise ConnectionError("Channel is not available")
 
         correlation_id = str(uuid.uuid4())
-        queue = await self._channel.declare_queue("", exclusive=True, auto_delete=True)
-        queue_name = queue.name
-
-        future = asyncio.get_event_loop().create_future()
+        future = asyncio.get_running_loop().create_future()
         self._response_futures[correlation_id] = future
-
-        async def on_response(message: aio_pika.IncomingMessage):
-            try:
-                data = json.loads(message.body.decode())
-                if data.get("correlation_id") == correlation_id:
-                    future.set_result(data)
-                    await message.ack()
-                else:
-                    await message.reject(requeue=True)
-            except Exception as e:
-                future.set_exception(e)
-
-        consumer_tag = await queue.consume(on_response)
-        self._consumer_tags[queue_name] = consumer_tag
+        started = time.perf_counter()
 
         try:
+            sent_at = datetime.now(UTC)
             message_body = {
                 "correlation_id": correlation_id,
                 "action": action,
                 **payload,
-                "reply_to": queue_name,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "reply_to": self._reply_queue_name,
+                "timestamp": sent_at.isoformat(),
+                # После дедлайна ответ уже никто не ждёт
+                "deadline": (sent_at + timedelta(seconds=self._timeout)).isoformat(),
             }
             body = json.dumps(message_body).encode("utf-8")
             message = aio_pika.Message(
                 body=body,
                 correlation_id=correlation_id,
-                reply_to=queue_name,
+                reply_to=self._reply_queue_name,
                 delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
                 content_type="application/json",
+                expiration=self._timeout,
             )
             await self._channel.default_exchange.publish(
                 message,
-                routing_key=settings.BOT_TO_BACKEND_QUEUE,
+                routing_key=self._queue_for(action),
             )
             try:
                 result = await asyncio.wait_for(future, timeout=self._timeout)
-                return result
-            except asyncio.TimeoutError:
+            except TimeoutError:
                 raise TimeoutError(f"No response after {self._timeout}s")
+            self._latencies[action].append((time.perf_counter() - started) * 1000)
+            return result
         finally:
             self._response_futures.pop(correlation_id, None)
-            if queue_name in self._consumer_tags:
-                await queue.cancel(self._consumer_tags.pop(queue_name))
-            try:
-                await queue.delete()
-            except Exception:
-                pass
 
     async def health(self) -> bool:
         try:
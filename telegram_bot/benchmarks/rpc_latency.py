@@ -0,0 +1,120 @@
+"""Round-trip latency of bot RPC calls against a running backend.
+
+Compares the shared per-process reply queue used by RabbitMQClient with
+the old pattern that declared, consumed and deleted a queue per request.
+
+Run from telegram_bot/:
+python -m benchmarks.rpc_latency [--requests N] [--concurrency C] [--chat-id ID]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from typing import Any
+
+import aio_pika
+
+from app.config import settings
+from app.infrastructure.client import RabbitMQClient
+
+ACTION = "get_live_match"
+
+
+def check_reply(reply: dict[str, Any]) -> None:
+    # Ответ с ошибкой валидации тоже быстрый, но меряет не тот путь
+    if reply.get("error"):
+        raise RuntimeError(f"{ACTION} failed: {reply['error']}")
+
+
+async def per_request_queue_call(
+    channel: aio_pika.abc.AbstractChannel, payload: dict[str, Any]
+) -> dict[str, Any]:
+    correlation_id = str(uuid.uuid4())
+    queue = await channel.declare_queue("", exclusive=True, auto_delete=True)
+    future = asyncio.get_running_loop().create_future()
+
+    async def on_response(message: aio_pika.abc.AbstractIncomingMessage):
+        await message.ack()
+        if message.correlation_id == correlation_id and not future.done():
+            future.set_result(json.loads(message.body))
+
+    tag = await queue.consume(on_response)
+    try:
+        body = {
+            "correlation_id": correlation_id,
+            "action": ACTION,
+            **payload,
+            "reply_to": queue.name,
+        }
+        await channel.default_exchange.publish(
+            aio_pika.Message(
+                body=json.dumps(body).encode(),
+                correlation_id=correlation_id,
+                reply_to=queue.name,
+            ),
+            routing_key=settings.BOT_TO_BACKEND_QUEUE,
+        )
+        return await asyncio.wait_for(future, timeout=settings.RABBITMQ_TIMEOUT)
+    finally:
+        await queue.cancel(tag)
+        await queue.delete()
+
+
+async def measure(call, requests: int, concurrency: int) -> tuple[list[float], float]:
+    samples = []
+
+    async def timed():
+        started = time.perf_counter()
+        check_reply(await call())
+        samples.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for _ in range(requests // concurrency):
+        await asyncio.gather(*(timed() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def report(name: str, samples: list[float], elapsed: float) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name:<20} n={len(ordered)} "
+        f"p50={statistics.median(ordered):.2f}ms p95={p95:.2f}ms "
+        f"max={ordered[-1]:.2f}ms rate={len(ordered) / elapsed:.0f} req/s"
+    )
+
+
+async def main(requests: int, concurrency: int, chat_id: int) -> None:
+    payload = {"chat_id": chat_id}
+    connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+    channel = await connection.channel()
+    legacy = await measure(
+        lambda: per_request_queue_call(channel, payload), requests, concurrency
+    )
+    await connection.close()
+
+    client = RabbitMQClient()
+    await client.start()
+    shared = await measure(
+        lambda: client.publish_request(ACTION, payload), requests, concurrency
+    )
+    await client.stop()
+
+    report("per-request queue", *legacy)
+    report("shared reply queue", *shared)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="requests in flight at once"
+    )
+    parser.add_argument(
+        "--chat-id", type=int, default=1, help="positive Telegram chat id"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.chat_id))